@@ -0,0 +1,112 @@
+"""
+Analytics benchmark for the Calorie Counter app
+Usage: python -m benchmarks.analytics_benchmark [--years N] [--meals-per-day N] [--repeat N] [--seed N]
+
+Builds a synthetic history of N years and times AnalyticsEngine weekly, monthly
+and yearly statistics and per-meal statistics with NumPy and with the pure
+Python fallback. Fails if both give different results.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+# Kivy must not treat our command line options as its own
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_LOG_MODE', 'PYTHON')
+
+
+def make_history(years, meals_per_day, seed):
+    """Returns [(date, meals)] ending today, with about one day in ten left empty"""
+    generator = random.Random(seed)
+    today = date.today()
+    day = today - timedelta(days=round(years * 365.25) - 1)
+    history = []
+    while day <= today:
+        meals = []
+        if generator.random() >= 0.1:
+            for _ in range(generator.randint(1, 2 * meals_per_day - 1)):
+                meals.append({
+                    'name': 'Meal',
+                    'calories': generator.randint(50, 1200),
+                    'time': '{:02d}:{:02d}'.format(generator.randint(6, 23), generator.randint(0, 59))
+                })
+        history.append((day.strftime('%Y-%m-%d'), meals))
+        day += timedelta(days=1)
+    return history
+
+
+def best_time(function, repeat):
+    """Returns the fastest of repeat runs in seconds and the last result"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def same(first, second):
+    """Compares two results, allowing float rounding differences"""
+    if isinstance(first, dict):
+        return first.keys() == second.keys() and all(same(first[key], second[key]) for key in first)
+    if isinstance(first, list):
+        return len(first) == len(second) and all(same(a, b) for a, b in zip(first, second))
+    if isinstance(first, float) or isinstance(second, float):
+        return math.isclose(first, second, rel_tol=1e-9, abs_tol=1e-6)
+    return first == second
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vectorized and pure Python analytics')
+    parser.add_argument('--years', type=float, default=5, help='years of synthetic history')
+    parser.add_argument('--meals-per-day', type=int, default=4, help='average meals on a logged day')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement, the fastest counts')
+    parser.add_argument('--seed', type=int, default=1, help='random seed of the synthetic history')
+    args = parser.parse_args()
+
+    from src.Analytics.AnalyticsEngine import AnalyticsEngine, np
+
+    history = make_history(args.years, args.meals_per_day, args.seed)
+    totals = {day: (sum(meal['calories'] for meal in meals), len(meals)) for day, meals in history}
+    print('{} days, {} meals, NumPy {}'.format(
+        len(history), sum(count for _, count in totals.values()), np.__version__ if np is not None else 'not installed'))
+
+    modes = [('python', False)] + ([('numpy', True)] if np is not None else [])
+    measurements = [
+        ('load days', lambda engine: AnalyticsEngine(totals, 2000, engine.use_numpy)),
+        ('load meals', lambda engine: engine.load_meals(history)),
+        ('weeks', lambda engine: engine.period_stats('week')),
+        ('months', lambda engine: engine.period_stats('month')),
+        ('years', lambda engine: engine.period_stats('year')),
+        ('meal stats', lambda engine: engine.meal_stats()),
+    ]
+
+    failed = False
+    print('{:12} {:>12} {:>12} {:>9}'.format('', *[name for name, _ in modes], 'speedup') if len(modes) > 1
+          else '{:12} {:>12}'.format('', 'python'))
+    engines = {name: AnalyticsEngine(totals, 2000, use_numpy) for name, use_numpy in modes}
+    for label, function in measurements:
+        timings, results = [], []
+        for name, _ in modes:
+            elapsed, result = best_time(lambda: function(engines[name]), args.repeat)
+            timings.append(elapsed)
+            results.append(result if isinstance(result, dict) else None)
+        row = '{:12}'.format(label) + ''.join('{:10.2f} ms'.format(elapsed * 1000) for elapsed in timings)
+        if len(timings) > 1:
+            row += '{:8.1f}x'.format(timings[0] / timings[1])
+            if not same(*results):
+                row += '  MISMATCH'
+                failed = True
+        print(row)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Multi-process throughput benchmark for the Calorie Counter storage
+Usage: python -m benchmarks.multiprocess_benchmark [--extension .json|.db|.journal|.shards]
+                                                   [--writers N] [--readers M] [--ops N]
+
+N writer processes add meals to the same day through CalorieDataManager while
+M reader processes read that day and the totals through their own backend.
+Reports operations per second and fails if a meal was lost or a read broke.
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Kivy must not treat our command line options as its own
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_LOG_MODE', 'PYTHON')
+
+
+def run_writer(path, ops, start_event, results):
+    """Adds ops meals to today's date and reports the elapsed time"""
+    from src.CalorieCounterApp.CalorieDataManager import CalorieDataManager
+
+    data_manager = CalorieDataManager(path)
+    start_event.wait()
+    started = time.perf_counter()
+    for i in range(ops):
+        data_manager.add_meal('Meal {}'.format(i), 100 + i % 50)
+    results.put(('writer', ops, time.perf_counter() - started, None))
+    data_manager.close()
+
+
+def run_reader(path, stop_event, start_event, results):
+    """Reads today's meals and all totals until the writers are done"""
+    from src.Storage.StorageFactory import StorageFactory
+
+    backend = StorageFactory.create_backend(path)
+    today = datetime.now().strftime('%Y-%m-%d')
+    reads, error = 0, None
+    start_event.wait()
+    started = time.perf_counter()
+    try:
+        while not stop_event.is_set():
+            backend.get_day(today)
+            backend.get_day_totals()
+            reads += 2
+    except Exception as e:
+        error = repr(e)
+    results.put(('reader', reads, time.perf_counter() - started, error))
+    backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent writer and reader processes')
+    parser.add_argument('--extension', default='.json', help='data file extension, picks the backend')
+    parser.add_argument('--writers', type=int, default=4, help='number of writer processes')
+    parser.add_argument('--readers', type=int, default=2, help='number of reader processes')
+    parser.add_argument('--ops', type=int, default=200, help='meals added by every writer')
+    args = parser.parse_args()
+
+    from src.Storage.StorageFactory import StorageFactory
+
+    directory = tempfile.mkdtemp(prefix='calorie_benchmark_')
+    path = os.path.join(directory, 'calorie_data' + args.extension)
+    try:
+        # Create the files once so readers never race the first writer
+        StorageFactory.create_backend(path).close()
+
+        start_event, stop_event = multiprocessing.Event(), multiprocessing.Event()
+        results = multiprocessing.Queue()
+        writers = [multiprocessing.Process(target=run_writer, args=(path, args.ops, start_event, results))
+                   for _ in range(args.writers)]
+        readers = [multiprocessing.Process(target=run_reader, args=(path, stop_event, start_event, results))
+                   for _ in range(args.readers)]
+        for process in writers + readers:
+            process.start()
+
+        started = time.perf_counter()
+        start_event.set()
+        for process in writers:
+            process.join()
+        elapsed = time.perf_counter() - started
+        stop_event.set()
+        for process in readers:
+            process.join()
+
+        outcomes = [results.get() for _ in writers + readers]
+        writes = sum(count for role, count, _, _ in outcomes if role == 'writer')
+        reads = sum(count for role, count, _, _ in outcomes if role == 'reader')
+        errors = [error for _, _, _, error in outcomes if error]
+
+        backend = StorageFactory.create_backend(path)
+        stored = len(backend.get_day(datetime.now().strftime('%Y-%m-%d')) or [])
+        backend.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    expected = args.writers * args.ops
+    print('{}: {} writers, {} readers'.format(args.extension, args.writers, args.readers))
+    print('  writes: {:8.0f} ops/s ({} meals in {:.2f} s)'.format(writes / elapsed, writes, elapsed))
+    print('  reads:  {:8.0f} ops/s'.format(reads / elapsed))
+    print('  stored: {} of {} meals'.format(stored, expected))
+    for error in errors:
+        print('  reader error: {}'.format(error))
+    if stored != expected or errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
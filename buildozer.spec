@@ -8,7 +8,7 @@ source.include_exts = py,png,jpg,kv,atlas,json
 source.exclude_dirs = tests, bin, venv, __pycache__, .git, .github
 source.include_dirs = src
 version = 1.0
-requirements = python3,kivy==2.1.0,kivymd,pillow,setuptools
+requirements = python3,kivy==2.1.0,kivymd,pillow,setuptools,sqlite3
 orientation = portrait
 fullscreen = 1
 
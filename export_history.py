@@ -0,0 +1,52 @@
+"""
+Headless export of the meal history
+Usage: python export_history.py [--data calorie_data.json | --profile ID] [--format csv|ndjson]
+                                [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+                                [--since "YYYY-MM-DD HH:MM"] [--output FILE]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Kivy must not treat our command line options as its own
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from src.CalorieCounterApp.CalorieDataManager import CalorieDataManager
+from src.CalorieCounterApp.ProfileManager import ProfileManager
+from src.Export.HistoryExporter import HistoryExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export meal history as CSV or NDJSON')
+    parser.add_argument('--data', default='calorie_data.json', help='data file to read')
+    parser.add_argument('--profile', help='export this profile instead of --data')
+    parser.add_argument('--format', default='csv', choices=HistoryExporter.FORMATS)
+    parser.add_argument('--start', help='first date to export (YYYY-MM-DD)')
+    parser.add_argument('--end', help='last date to export (YYYY-MM-DD)')
+    parser.add_argument('--since', help='only meals eaten at or after "YYYY-MM-DD HH:MM"')
+    parser.add_argument('--output', help='output file (defaults to stdout)')
+    args = parser.parse_args()
+
+    since = datetime.strptime(args.since, '%Y-%m-%d %H:%M') if args.since else None
+
+    if args.profile:
+        data_path = ProfileManager().get_data_path(args.profile)
+    else:
+        data_path = args.data
+    data_manager = CalorieDataManager(data_path, read_only=True)  # Exporting must not change the store
+    exporter = HistoryExporter(data_manager)
+    try:
+        if args.output:
+            count = exporter.export_to_file(args.output, args.format, args.start, args.end, since)
+        else:
+            count = exporter.export_to_stream(sys.stdout, args.format, args.start, args.end, since)
+    finally:
+        data_manager.close()
+
+    print(f'Exported {count} meals', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
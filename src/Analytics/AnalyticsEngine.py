@@ -0,0 +1,284 @@
+"""
+Analytics engine for the Calorie Counter app
+Computes long-range statistics over the calorie history in vectorized passes
+"""
+
+import math
+from datetime import date as date_type
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, e.g. in Android builds
+    np = None
+
+
+class AnalyticsEngine:
+    """
+    Daily totals and optionally per-meal records held as parallel arrays.
+
+    With NumPy the arrays are ndarrays and every statistic is a handful of
+    bincount/searchsorted passes; without it the same results come from plain
+    Python loops, so callers never need to know which one is in use.
+
+    Period statistics cover every calendar day of the range, so days without
+    meals count as 0 kcal in means, standard deviations and targets, the same
+    as in CalorieDataManager.get_range_stats.
+    """
+
+    PERIODS = ('week', 'month', 'year')
+    EPOCH_ORDINAL = date_type(1970, 1, 1).toordinal()
+
+    def __init__(self, day_totals, daily_target, use_numpy=True):
+        """day_totals is {'YYYY-MM-DD': (calories, meals_count)}"""
+        self.daily_target = daily_target
+        self.use_numpy = use_numpy and np is not None
+
+        dates = sorted(date for date, (calories, meals_count) in day_totals.items() if meals_count or calories)
+        if self.use_numpy:
+            # ISO strings parse straight into datetime64 days
+            days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+            self.ordinals = days + self.EPOCH_ORDINAL
+            self.calories = np.array([day_totals[date][0] for date in dates], dtype=np.int64)
+            self.meals = np.array([day_totals[date][1] for date in dates], dtype=np.int64)
+        else:
+            self.ordinals = [date_type.fromisoformat(date).toordinal() for date in dates]
+            self.calories = [day_totals[date][0] for date in dates]
+            self.meals = [day_totals[date][1] for date in dates]
+
+        self.meal_ordinals = self.meal_calories = self.meal_minutes = None
+
+    def first_date(self):
+        """Returns the first day with meals or None for an empty history"""
+        if not len(self.ordinals):
+            return None
+        return date_type.fromordinal(int(self.ordinals[0]))
+
+    # === Per-meal records ===
+
+    def load_meals(self, days):
+        """Loads per-meal records from (date, meals) pairs, e.g. CalorieDataManager.iter_days()"""
+        ordinals, calories, minutes = [], [], []
+        for date, meals in days:
+            ordinal = date_type.fromisoformat(date).toordinal()
+            for meal in meals:
+                hours, mins = meal['time'].split(':')
+                ordinals.append(ordinal)
+                calories.append(meal['calories'])
+                minutes.append(int(hours) * 60 + int(mins))
+
+        if self.use_numpy:
+            self.meal_ordinals = np.array(ordinals, dtype=np.int64)
+            self.meal_calories = np.array(calories, dtype=np.int64)
+            self.meal_minutes = np.array(minutes, dtype=np.int64)
+        else:
+            self.meal_ordinals, self.meal_calories, self.meal_minutes = ordinals, calories, minutes
+
+    def meal_stats(self):
+        """Returns count, mean and standard deviation of meal sizes and meals per hour of day"""
+        self._require_meals()
+        count = len(self.meal_calories)
+        if self.use_numpy:
+            mean = float(self.meal_calories.mean()) if count else 0.0
+            std = float(self.meal_calories.std()) if count else 0.0
+            hourly = np.bincount(self.meal_minutes // 60, minlength=24).tolist()
+        else:
+            mean = sum(self.meal_calories) / count if count else 0.0
+            std = math.sqrt(sum((value - mean) ** 2 for value in self.meal_calories) / count) if count else 0.0
+            hourly = [0] * 24
+            for minute in self.meal_minutes:
+                hourly[minute // 60] += 1
+
+        return {'meals_count': count, 'avg_meal': mean, 'std_meal': std, 'hourly': hourly}
+
+    def _require_meals(self):
+        """Raises ValueError unless per-meal records are loaded"""
+        if self.meal_calories is None:
+            raise ValueError("Meal records are not loaded, call load_meals first")
+
+    def time_distribution(self, start=None, end=None):
+        """
+        Returns calories and meal counts of the loaded meals in start..end (dates or
+        'YYYY-MM-DD', open ends by default) as 7x24 lists, weekday (Monday first) by hour
+        """
+        self._require_meals()
+        if isinstance(start, str):
+            start = date_type.fromisoformat(start)
+        if isinstance(end, str):
+            end = date_type.fromisoformat(end)
+        first = start.toordinal() if start else None
+        last = end.toordinal() if end else None
+
+        if self.use_numpy:
+            mask = np.ones(len(self.meal_ordinals), dtype=bool)
+            if first is not None:
+                mask &= self.meal_ordinals >= first
+            if last is not None:
+                mask &= self.meal_ordinals <= last
+            # Ordinal 1 is a Monday, so (ordinal - 1) % 7 is the weekday
+            cells = ((self.meal_ordinals[mask] - 1) % 7) * 24 + self.meal_minutes[mask] // 60
+            calories = np.bincount(cells, weights=self.meal_calories[mask], minlength=168).astype(np.int64)
+            meals = np.bincount(cells, minlength=168)
+            return {'calories': calories.reshape(7, 24).tolist(), 'meals': meals.reshape(7, 24).tolist()}
+
+        calories = [[0] * 24 for _ in range(7)]
+        meals = [[0] * 24 for _ in range(7)]
+        for ordinal, meal_calories, minute in zip(self.meal_ordinals, self.meal_calories, self.meal_minutes):
+            if (first is not None and ordinal < first) or (last is not None and ordinal > last):
+                continue
+            weekday, hour = (ordinal - 1) % 7, minute // 60
+            calories[weekday][hour] += meal_calories
+            meals[weekday][hour] += 1
+        return {'calories': calories, 'meals': meals}
+
+    def intake_curve(self, day_start_minute=0):
+        """
+        Returns the average calories eaten by the end of each of the 24 hours after
+        day_start_minute, over the days that have loaded meals
+        """
+        self._require_meals()
+        if self.use_numpy:
+            days = len(np.unique(self.meal_ordinals))
+            hours = (self.meal_minutes - day_start_minute) % 1440 // 60
+            hourly = np.bincount(hours, weights=self.meal_calories, minlength=24)
+            return (np.cumsum(hourly) / days).tolist() if days else [0.0] * 24
+
+        days = len(set(self.meal_ordinals))
+        hourly = [0] * 24
+        for meal_calories, minute in zip(self.meal_calories, self.meal_minutes):
+            hourly[(minute - day_start_minute) % 1440 // 60] += meal_calories
+        curve, total = [], 0
+        for calories in hourly:
+            total += calories
+            curve.append(total / days if days else 0.0)
+        return curve
+
+    # === Period statistics ===
+
+    def _bucket_key(self, ordinal, period):
+        """Returns the week, month or year number of a day ordinal (Python fallback)"""
+        if period == 'week':
+            return (ordinal - 1) // 7  # Ordinal 1 is a Monday
+        day = date_type.fromordinal(ordinal)
+        if period == 'month':
+            return (day.year - 1970) * 12 + day.month - 1
+        return day.year - 1970
+
+    def _bucket_keys(self, ordinals, period):
+        """Returns week, month or year numbers of an ordinal array, matching _bucket_key"""
+        if period == 'week':
+            return (ordinals - 1) // 7
+        days = (ordinals - self.EPOCH_ORDINAL).astype('datetime64[D]')
+        unit = 'datetime64[M]' if period == 'month' else 'datetime64[Y]'
+        return days.astype(unit).astype(np.int64)
+
+    def _bucket_columns_numpy(self, period, start, end):
+        """Returns per-bucket (first ordinal, last ordinal, days, calories, squares, meals, logged days)"""
+        calendar = np.arange(start, end + 1, dtype=np.int64)
+        calendar_keys = self._bucket_keys(calendar, period)
+        first_key = calendar_keys[0]
+        positions = calendar_keys - first_key
+        size = int(positions[-1]) + 1
+
+        days = np.bincount(positions, minlength=size)
+        firsts = calendar[np.flatnonzero(np.diff(positions, prepend=-1))]
+        lasts = firsts + days - 1
+
+        low = np.searchsorted(self.ordinals, start, 'left')
+        high = np.searchsorted(self.ordinals, end, 'right')
+        indexes = self._bucket_keys(self.ordinals[low:high], period) - first_key
+        calories = self.calories[low:high]
+        sums = np.bincount(indexes, weights=calories, minlength=size)
+        squares = np.bincount(indexes, weights=calories.astype(np.float64) ** 2, minlength=size)
+        meals = np.bincount(indexes, weights=self.meals[low:high], minlength=size)
+        logged = np.bincount(indexes, minlength=size)
+        return zip(firsts.tolist(), lasts.tolist(), days.tolist(), sums.tolist(),
+                   squares.tolist(), meals.tolist(), logged.tolist())
+
+    def _bucket_columns_python(self, period, start, end):
+        """Pure Python version of _bucket_columns_numpy"""
+        buckets = {}
+        for ordinal in range(start, end + 1):
+            key = self._bucket_key(ordinal, period)
+            if key not in buckets:
+                buckets[key] = [ordinal, ordinal, 0, 0, 0, 0, 0]
+            bucket = buckets[key]
+            bucket[1] = ordinal
+            bucket[2] += 1
+
+        for ordinal, calories, meals_count in zip(self.ordinals, self.calories, self.meals):
+            if start <= ordinal <= end:
+                bucket = buckets[self._bucket_key(ordinal, period)]
+                bucket[3] += calories
+                bucket[4] += calories * calories
+                bucket[5] += meals_count
+                bucket[6] += 1
+        return [tuple(buckets[key]) for key in sorted(buckets)]
+
+    def period_stats(self, period, start=None, end=None):
+        """
+        Returns statistics for start..end (dates or 'YYYY-MM-DD', by default the whole
+        history up to today) grouped by week, month or year, in the shape of
+        CalorieDataManager.get_range_stats plus daily standard deviations
+        """
+        if period not in self.PERIODS:
+            raise ValueError("Period must be 'week', 'month' or 'year'")
+        if isinstance(start, str):
+            start = date_type.fromisoformat(start)
+        if isinstance(end, str):
+            end = date_type.fromisoformat(end)
+        end = end or date_type.today()
+        start = start or self.first_date() or end
+        if start > end:
+            start = end
+
+        if self.use_numpy:
+            columns = self._bucket_columns_numpy(period, start.toordinal(), end.toordinal())
+        else:
+            columns = self._bucket_columns_python(period, start.toordinal(), end.toordinal())
+
+        buckets = []
+        total_days = total_calories = total_squares = total_meals = total_logged = 0
+        for first, last, days, calories, squares, meals_count, logged in columns:
+            calories, meals_count = int(calories), int(meals_count)
+            target = days * self.daily_target
+            buckets.append(dict(
+                self._summary(days, calories, squares, target),
+                date=date_type.fromordinal(first),
+                date_str=date_type.fromordinal(first).strftime('%Y-%m-%d'),
+                end_date=date_type.fromordinal(last),
+                meals_count=meals_count,
+                logged_days=int(logged)
+            ))
+            total_days += days
+            total_calories += calories
+            total_squares += squares
+            total_meals += meals_count
+            total_logged += logged
+
+        summary = self._summary(total_days, total_calories, total_squares, total_days * self.daily_target)
+        return {
+            'bucket': period,
+            'buckets': buckets,  # Oldest to newest
+            'days': total_days,
+            'total_calories': total_calories,
+            'target_total': summary['target'],
+            'percentage': summary['progress_percentage'],
+            'avg_daily': summary['avg_daily'],
+            'std_daily': summary['std_daily'],
+            'meals_count': total_meals,
+            'logged_days': int(total_logged)
+        }
+
+    @staticmethod
+    def _summary(days, calories, squares, target):
+        """Returns sum, mean, standard deviation and percent of target of days' calories"""
+        mean = calories / days if days else 0
+        variance = squares / days - mean * mean if days else 0
+        return {
+            'days': days,
+            'calories': calories,
+            'target': target,
+            'avg_daily': mean,
+            'std_daily': math.sqrt(max(variance, 0)),
+            'progress_percentage': (calories / target * 100) if target > 0 else 0
+        }
@@ -0,0 +1,100 @@
+"""
+Rolling statistics for the Calorie Counter app
+Keeps moving averages and linear trends of the last days up to date incrementally
+"""
+
+from datetime import date as date_type
+
+
+class RollingStats:
+    """
+    Moving averages and least-squares trends of daily calories over windows
+    of the last 7, 30 and 90 days ending on a given day.
+
+    Every window keeps the sum of its days' calories and the sum of calories
+    times day ordinal; the sums over the ordinals themselves follow from the
+    window bounds. A changed day adds its delta to each window that covers it,
+    and moving the end day slides the windows by adding the entering and
+    subtracting the leaving days, so no update depends on the history length.
+    Days without meals count as 0 kcal, as in the period statistics.
+    """
+
+    WINDOWS = (7, 30, 90)
+
+    def __init__(self, calories_of, end, windows=WINDOWS):
+        """calories_of returns the calories of a 'YYYY-MM-DD' date, end is the last day of the windows"""
+        self.calories_of = calories_of
+        self.windows = tuple(windows)
+        self._rebuild(self.to_ordinal(end))
+
+    @staticmethod
+    def to_ordinal(day):
+        """Returns the proleptic ordinal of a date object or 'YYYY-MM-DD' string"""
+        if isinstance(day, str):
+            return date_type.fromisoformat(day).toordinal()
+        return day.toordinal()
+
+    def _calories_at(self, ordinal):
+        """Returns the calories of the day with the given ordinal"""
+        return self.calories_of(date_type.fromordinal(ordinal).strftime('%Y-%m-%d'))
+
+    def _rebuild(self, end):
+        """Sums every window ending on end from scratch"""
+        self.end = end
+        self._sums = {}
+        for window in self.windows:
+            total = weighted = 0
+            for ordinal in range(end - window + 1, end + 1):
+                calories = self._calories_at(ordinal)
+                total += calories
+                weighted += calories * ordinal
+            self._sums[window] = [total, weighted]
+
+    def apply(self, day, calories_delta):
+        """Applies a change of one day's calories to the windows covering it"""
+        ordinal = self.to_ordinal(day)
+        for window, sums in self._sums.items():
+            if self.end - window < ordinal <= self.end:
+                sums[0] += calories_delta
+                sums[1] += calories_delta * ordinal
+
+    def move_to(self, end):
+        """Slides the windows so they end on end, e.g. after a day rollover"""
+        end = self.to_ordinal(end)
+        if end == self.end:
+            return
+        if end < self.end or end - self.end >= max(self.windows):
+            # Clock set back or a long gap: sliding would not be cheaper
+            self._rebuild(end)
+            return
+
+        for ordinal in range(self.end + 1, end + 1):
+            entering = self._calories_at(ordinal)
+            for window, sums in self._sums.items():
+                leaving = self._calories_at(ordinal - window)
+                sums[0] += entering - leaving
+                sums[1] += entering * ordinal - leaving * (ordinal - window)
+        self.end = end
+
+    def get_window(self, window):
+        """
+        Returns the average, the trend slope (kcal per day per day) and the trend
+        value on the last day of one window
+        """
+        total, weighted = self._sums[window]
+        mean = total / window
+        # Least squares over consecutive x: n*Sxx - Sx^2 = n^2 * (n^2 - 1) / 12
+        first = self.end - window + 1
+        sum_x = window * (first + self.end) // 2  # Always an even product
+        denominator = window * window * (window * window - 1) / 12
+        slope = (window * weighted - sum_x * total) / denominator if denominator else 0.0
+        return {
+            'days': window,
+            'avg_daily': mean,
+            'slope': slope,
+            'trend_value': mean + slope * (window - 1) / 2  # The fitted line runs through the mean at the middle day
+        }
+
+    def get_stats(self):
+        """Returns {window: get_window(window)} for every window"""
+        return {window: self.get_window(window) for window in self.windows}
@@ -0,0 +1,79 @@
+"""
+Statistics result cache for the Calorie Counter app
+Reuses computed statistics until a day they cover changes
+"""
+
+from collections import OrderedDict
+
+
+class StatsCache:
+    """
+    Results of statistics queries keyed by query, e.g. (start, end, bucket).
+
+    Every day carries a data version taken from one monotonically increasing
+    counter whenever its totals change. A result remembers the date range it
+    covers; touching a day drops only the results whose range contains it,
+    so a lookup is a dict access and editing today leaves results of past
+    ranges alone. At most max_entries results are kept, the least recently
+    used ones are dropped first.
+
+    Cached results are shared between callers and must not be modified.
+    """
+
+    # Range bounds of open ranges, 'YYYY-MM-DD' keys compare as strings
+    MIN_DATE = '0000-00-00'
+    MAX_DATE = '9999-99-99'
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.version = 0
+        self._base_version = 0  # Version of every day at the last touch_all
+        self._day_versions = {}
+        self._entries = OrderedDict()  # key -> (start, end, result)
+
+    def get(self, key):
+        """Returns the cached result of key or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key, start, end, result, version=None):
+        """
+        Stores the result of key that covers start..end ('YYYY-MM-DD' or None for open ends).
+        A result computed from the data as of version (a value of self.version) is
+        not stored if a day of its range changed since.
+        """
+        start, end = start or self.MIN_DATE, end or self.MAX_DATE
+        if version is not None and self._changed_since(version, start, end):
+            return
+        self._entries[key] = (start, end, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _changed_since(self, version, start, end):
+        """Returns True if a day in start..end was touched after version"""
+        if self._base_version > version:
+            return True
+        return any(day_version > version and start <= date <= end
+                   for date, day_version in self._day_versions.items())
+
+    def touch(self, date):
+        """Bumps the version of date and drops the results covering it"""
+        self.version += 1
+        self._day_versions[date] = self.version
+        for key in [key for key, (start, end, _) in self._entries.items() if start <= date <= end]:
+            del self._entries[key]
+
+    def clear(self):
+        """Drops every result without changing day versions, e.g. after a target change"""
+        self._entries.clear()
+
+    def touch_all(self):
+        """Bumps the version of every day and drops every result, e.g. after a reload"""
+        self.version += 1
+        self._base_version = self.version
+        self._day_versions.clear()
+        self._entries.clear()
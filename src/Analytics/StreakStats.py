@@ -0,0 +1,163 @@
+"""
+Goal streak statistics for the Calorie Counter app
+Tracks under-target streaks and target adherence incrementally
+"""
+
+from collections import Counter
+from datetime import date as date_type
+
+
+class StreakStats:
+    """
+    Streak and adherence statistics over per-day totals.
+
+    A day is logged when it has meals and under target when it is logged and
+    its calories do not exceed the daily target; it is within target when its
+    calories are at most TOLERANCE away from the target. Streaks are runs of
+    consecutive under-target days, kept as {start: end} and {end: start} maps
+    plus a counter of run lengths. The constructor builds everything in one
+    pass over the sorted totals, and a changed day merges or splits at most one
+    run, so updates do not depend on the history length.
+    """
+
+    TOLERANCE = 0.10
+
+    def __init__(self, day_totals, daily_target):
+        """day_totals is {'YYYY-MM-DD': (calories, meals_count)}"""
+        self.daily_target = daily_target
+        self._days = {}  # ordinal -> (under target, within target) of logged days
+        self._run_end = {}
+        self._run_start = {}
+        self._run_lengths = Counter()
+        self.logged_per_month = Counter()
+        self.within_days = 0
+
+        run_start = previous = None
+        for date in sorted(day_totals):
+            ordinal = date_type.fromisoformat(date).toordinal()
+            under = self._count_day(date, ordinal, *day_totals[date])
+            if not under:
+                continue
+            # Sorted input: extend the open run or close it and start a new one
+            if previous is not None and ordinal == previous + 1:
+                previous = ordinal
+                continue
+            if run_start is not None:
+                self._add_run(run_start, previous)
+            run_start = previous = ordinal
+        if run_start is not None:
+            self._add_run(run_start, previous)
+
+    def _classify(self, calories):
+        """Returns (under target, within target) of a logged day's totals"""
+        under = calories <= self.daily_target
+        within = abs(calories - self.daily_target) <= self.daily_target * self.TOLERANCE
+        return under, within
+
+    def _count_day(self, date, ordinal, calories, meals_count):
+        """Adds a day to the logged and within-target counts, returns whether it is under target"""
+        if meals_count <= 0:
+            return False
+        under, within = self._classify(calories)
+        self._days[ordinal] = (under, within)
+        self.logged_per_month[date[:7]] += 1
+        self.within_days += within
+        return under
+
+    def _uncount_day(self, date, ordinal):
+        """Removes a logged day from the counts, returns whether it was under target"""
+        under, within = self._days.pop(ordinal)
+        self.logged_per_month[date[:7]] -= 1
+        if not self.logged_per_month[date[:7]]:
+            del self.logged_per_month[date[:7]]
+        self.within_days -= within
+        return under
+
+    # === Runs ===
+
+    def _add_run(self, start, end):
+        """Registers the run start..end"""
+        self._run_end[start] = end
+        self._run_start[end] = start
+        self._run_lengths[end - start + 1] += 1
+
+    def _remove_run(self, start, end):
+        """Unregisters the run start..end"""
+        del self._run_end[start]
+        del self._run_start[end]
+        length = end - start + 1
+        self._run_lengths[length] -= 1
+        if not self._run_lengths[length]:
+            del self._run_lengths[length]
+
+    def _run_containing(self, ordinal):
+        """Returns (start, end) of the run containing an under-target day"""
+        end = ordinal
+        while end not in self._run_start:  # Only future days can follow, usually none
+            end += 1
+        return self._run_start[end], end
+
+    def _insert(self, ordinal):
+        """Adds an under-target day, merging it with the runs next to it"""
+        start = end = ordinal
+        if ordinal - 1 in self._run_start:
+            start = self._run_start[ordinal - 1]
+            self._remove_run(start, ordinal - 1)
+        if ordinal + 1 in self._run_end:
+            end = self._run_end[ordinal + 1]
+            self._remove_run(ordinal + 1, end)
+        self._add_run(start, end)
+
+    def _erase(self, ordinal):
+        """Removes an under-target day, splitting its run"""
+        start, end = self._run_containing(ordinal)
+        self._remove_run(start, end)
+        if start < ordinal:
+            self._add_run(start, ordinal - 1)
+        if ordinal < end:
+            self._add_run(ordinal + 1, end)
+
+    def update(self, date, calories, meals_count):
+        """Applies the new totals of one day"""
+        ordinal = date_type.fromisoformat(date).toordinal()
+        was_under = self._uncount_day(date, ordinal) if ordinal in self._days else False
+        is_under = self._count_day(date, ordinal, calories, meals_count)
+        if was_under and not is_under:
+            self._erase(ordinal)
+        elif is_under and not was_under:
+            self._insert(ordinal)
+
+    # === Results ===
+
+    def is_under_target(self, ordinal):
+        """Returns whether the day with the given ordinal is a logged under-target day"""
+        return self._days.get(ordinal, (False, False))[0]
+
+    def current_streak(self, today):
+        """
+        Returns the length of the under-target streak ending today; a day without
+        meals yet does not break the streak, it continues from yesterday
+        """
+        ordinal = date_type.fromisoformat(today).toordinal()
+        if ordinal not in self._days:
+            ordinal -= 1
+        if not self.is_under_target(ordinal):
+            return 0
+        start, _ = self._run_containing(ordinal)
+        return ordinal - start + 1
+
+    def longest_streak(self):
+        """Returns the length of the longest under-target streak"""
+        return max(self._run_lengths) if self._run_lengths else 0
+
+    def get_stats(self, today):
+        """Returns streaks, days logged per month and the share of logged days within target"""
+        logged_days = len(self._days)
+        return {
+            'current_streak': self.current_streak(today),
+            'longest_streak': self.longest_streak(),
+            'logged_days': logged_days,
+            'logged_per_month': dict(sorted(self.logged_per_month.items())),
+            'within_target_days': self.within_days,
+            'within_target_percentage': (self.within_days / logged_days * 100) if logged_days else 0
+        }
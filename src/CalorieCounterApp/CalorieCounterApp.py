@@ -9,13 +9,11 @@ from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.floatlayout import FloatLayout
-from kivy.clock import Clock
 from kivy.graphics import Color, RoundedRectangle
 from kivy.utils import get_color_from_hex
 from kivy.metrics import dp
-from datetime import datetime
 
-from src.CalorieCounterApp.CalorieDataManager import CalorieDataManager
+from src.CalorieCounterApp.ProfileManager import ProfileManager
 from src.Styled.StyledLabel import StyledLabel
 from src.Styled.StyledButton import StyledButton
 from src.Styled.StyledTextInput import StyledTextInput
@@ -28,7 +26,7 @@ from src.CalorieCounterApp.AppHeader import AppHeader
 from src.CalorieCounterApp.DailyInfoCard import DailyInfoCard
 from src.MealManager.AddMealSection import AddMealSection
 from src.MealManager.MealsHeader import MealsHeader
-from src.consts import Colors
+from src.consts import Colors, Storage, Day
 
 
 class CalorieCounterApp(App):
@@ -36,10 +34,19 @@ class CalorieCounterApp(App):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.data_manager = CalorieDataManager()
+        self.profile_manager = ProfileManager(
+            flush_delay=Storage.FLUSH_DELAY,
+            write_queue_size=Storage.WRITE_QUEUE_SIZE,
+            rollup_after_days=Storage.ROLLUP_AFTER_DAYS,
+            day_start_hour=Day.START_HOUR
+        )
+        self.data_manager = self.profile_manager.get_data_manager()
         self.stats_display = StatsDisplay(self.data_manager)
-        self.settings_display = SettingsDisplay(self.data_manager)
-        self.today = datetime.now().strftime('%Y-%m-%d')
+        self.settings_display = SettingsDisplay(
+            self.data_manager,
+            profile_manager=self.profile_manager,
+            on_profile_change=self.switch_profile
+        )
         
     def build(self):
         """Builds the main application interface with fixed elements and scrollable meal cards"""
@@ -126,15 +133,14 @@ class CalorieCounterApp(App):
             self.data_manager,
             self.meals_layout,
             meal_name_input,
-            calories_input,
-            self.update_daily_info
+            calories_input
         )
         
         # Load today's meals
         self.meal_manager.load_today_meals()
         
-        # Update interface every second
-        Clock.schedule_interval(self.update_display, 1)
+        # No periodic refresh: views redraw on data change events, including the
+        # data manager's rollover event at the start of a new day
         
         return main_layout
     
@@ -180,20 +186,27 @@ class CalorieCounterApp(App):
         """Shows weekly statistics"""
         self.stats_display.show_weekly_stats()
     
-    def update_display(self, dt):
-        """Updates display every second"""
-        # Check if day has changed
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        if current_date != self.today:
-            self.today = current_date
-            self.meal_manager.load_today_meals()
-        
-        self.update_daily_info()
-    
-    def update_daily_info(self):
-        """Updates daily requirement information with colors"""
-        self.daily_info_card.update_info()
-    
     def _show_settings(self, instance):
         """Shows the settings display"""
         self.settings_display.show_settings()
+    
+    def switch_profile(self, profile_id):
+        """Points every view at the data manager of another profile"""
+        self.data_manager = self.profile_manager.switch_profile(profile_id)
+        self.stats_display.set_data_manager(self.data_manager)
+        self.settings_display.set_data_manager(self.data_manager)
+        self.daily_info_card.set_data_manager(self.data_manager)
+        self.meal_manager.set_data_manager(self.data_manager)
+    
+    def on_pause(self):
+        """Writes pending meal changes before the app goes to background"""
+        self.profile_manager.flush(wait=True)
+        return True
+    
+    def on_resume(self):
+        """Picks up meals other processes (e.g. an import) stored while the app was in background"""
+        self.data_manager.reload()  # Views redraw on the change event
+    
+    def on_stop(self):
+        """Writes pending meal changes and closes storage on exit"""
+        self.profile_manager.close()
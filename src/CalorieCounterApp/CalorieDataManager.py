@@ -3,20 +3,238 @@ Data management for the Calorie Counter app
 Handles storing and retrieving meal data
 """
 
-from kivy.storage.jsonstore import JsonStore
-from datetime import datetime, timedelta
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
 
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+from datetime import date as date_type, datetime, timedelta
 
-class CalorieDataManager:
-    """Manages calorie data storage and retrieval"""
+from src.Analytics.AnalyticsEngine import AnalyticsEngine
+from src.Analytics.RollingStats import RollingStats
+from src.Analytics.StatsCache import StatsCache
+from src.Analytics.StreakStats import StreakStats
+from src.CalorieCounterApp.PrefixSumIndex import PrefixSumIndex
+from src.Storage.AsyncStorageBackend import AsyncStorageBackend
+from src.Storage.ColdArchive import ColdArchive
+from src.Storage.ColumnarArchive import ColumnarArchive
+from src.Storage.DailyRollup import DailyRollup
+from src.Storage.StorageFactory import StorageFactory
+
+
+class CalorieDataManager(EventDispatcher):
+    """
+    Manages calorie data storage and retrieval.
+    
+    Every change is announced with a change event, so views redraw only when
+    the data they show actually changed:
+        on_meal_added(date, meal), on_meal_deleted(date, meal),
+        on_meal_updated(date, meal), on_day_cleared(date),
+        on_days_changed(dates) - several days at once, None after a reload,
+        on_target_changed(target),
+        on_day_rollover(date) - a new day started, date is the new today
+    
+    Today's date key is cached together with the moment it ends. A day starts
+    at day_start_hour local time, so meals eaten after midnight but before
+    that hour count to the previous day. One Clock timer wakes up when the
+    day ends (DST shifts are resolved by the local time conversion) to
+    announce the rollover.
+    
+    Statistics queries may run on a worker thread while changes keep coming
+    from the main thread; both sides take the statistics lock around the
+    totals index, the statistics built from it and removals from the day
+    cache. Scans over stored meals copy what they need under the lock and
+    read the days without holding it.
+    """
+    
+    CHANGE_EVENTS = (
+        'on_meal_added',
+        'on_meal_deleted',
+        'on_meal_updated',
+        'on_day_cleared',
+        'on_days_changed',
+        'on_target_changed',
+        'on_day_rollover'
+    )
+    __events__ = CHANGE_EVENTS
+    
+    # Clock timers run on monotonic time; waking up at least this often (seconds)
+    # notices wall clock jumps even without a read of today's key
+    MAX_ROLLOVER_WAIT = 3600
     
-    def __init__(self, filename='calorie_data.json'):
-        self.store = JsonStore(filename)
+    # Days before today that make up the usual intake curve of the pacing indicator
+    PACING_DAYS = 28
+    
+    # Meal ids hold the ordinal of their day above ID_RANDOM_BITS random bits, so every
+    # id tells which day to page in and processes sharing the files never pick the same
+    # id. Ids given before that are creation times in milliseconds, below DATED_ID_FLAG.
+    DATED_ID_FLAG = 1 << 62
+    ID_RANDOM_BITS = 40
+    
+    def __init__(self, filename='calorie_data.json', backend=None, flush_delay=0, archive_path=None,
+                 write_queue_size=0, cache_days=31, rollup_after_days=0, keep_cold_detail=True,
+                 write_worker=None, day_start_hour=0, read_only=False):
+        super().__init__()
+        
+        # Backend is picked from the file extension unless given explicitly
+        self.backend = backend if backend is not None else StorageFactory.create_backend(filename)
+        
+        # With write_queue_size > 0 (or a shared write_worker) writes run on a
+        # persistence worker thread and button handlers return without waiting for the disk
+        if write_queue_size or write_worker is not None:
+            self.backend = AsyncStorageBackend(self.backend, write_queue_size, write_worker)
+        
+        # Closed days live in a columnar archive next to the data file;
+        # an explicitly given backend only gets one when archive_path is set
+        if archive_path is None and backend is None:
+            archive_path = os.path.splitext(filename)[0] + '.archive'
+        self.archive = ColumnarArchive(archive_path) if archive_path else None
+        
+        # Days older than rollup_after_days (0 keeps all detail) are reduced to daily
+        # aggregates; their meal lists optionally go to a compressed cold archive
+        self.rollup_after_days = rollup_after_days
+        self.rollup = None
+        self.cold_archive = None
+        if self.archive is not None:
+            archive_base = os.path.splitext(archive_path)[0]
+            self.rollup = DailyRollup(archive_base + '.rollup')
+            if keep_cold_detail:
+                self.cold_archive = ColdArchive(archive_base + '.cold.gz')
         self.daily_target = self.load_daily_target()  # Load saved target or use default
         
+        # Cached today's key, valid between the two timestamps
+        self.day_start_hour = self.backend.get_setting('day_start_hour', day_start_hour)
+        self._today = None
+        self._today_start = self._today_end = 0
+        self._announced_today = None
+        self._rollover_event = None
+        self._update_today()
+        
+        # Write-back cache: with flush_delay > 0 changes stay in memory and
+        # dirty days are written together once no change happened for flush_delay seconds.
+        # Every dirty day keeps the meals it had before its first change, so flushing
+        # merges the changes into what other processes stored meanwhile
+        self.flush_delay = flush_delay
+        
+        # Days are paged in on demand and kept in an LRU of at most cache_days clean
+        # days; dirty days and today are never evicted
+        self.cache_days = cache_days
+        self._day_cache = OrderedDict()
+        self._dirty_dates = {}  # date -> meals before the first unflushed change
+        self._flush_event = None
+        
+        # Statistics results are reused until one of the days they cover changes.
+        # Statistics may be computed on a worker thread; the lock keeps them from
+        # seeing the totals index half-updated by a change on the main thread
+        self._stats_lock = threading.RLock()
+        self._stats_cache = StatsCache()
+        
+        # Materialized {date: (calories, meals_count)} index, updated on every change
+        self._load_totals()
+        
+        # Every meal carries a stable id; {id: (date, slot)} covers all cached days.
+        # Meals stored without one get an id derived from their slot when read, which is
+        # stored only once their day changes, so reads never rewrite files
+        self._meal_index = {}
+        self._unsaved_ids = set()
+        
+        # A read-only manager (e.g. for exports) leaves the stored files as they are:
+        # no archiving or rollup on open
+        self.read_only = read_only
+        if not read_only:
+            self.archive_closed_days()
+            if rollup_after_days:
+                self.rollup_old_days(rollup_after_days)
+        
+    def _load_totals(self):
+        """
+        Builds the totals index from the backend's days; totals of archived days
+        are merged in only when a query needs the whole history
+        """
+        with self._stats_lock:
+            self._day_totals = self.backend.get_day_totals()
+            if self.rollup is not None:
+                # Meals added to a rolled-up day are stored next to its aggregate
+                for date in self._day_totals:
+                    if date in self.rollup:
+                        self._day_totals[date] = self._add_totals(self._day_totals[date], self.rollup.get_day_total(date))
+            self._history_loaded = self.archive is None
+            self._prefix_sums = None  # Built on the first range query
+            self._rolling_stats = None  # Built on the first rolling stats query
+            self._streak_stats = None  # Built on the first streak query
+            self._stats_cache.touch_all()
+    
+    def reload(self):
+        """
+        Drops cached days and totals so changes other processes made to the same
+        files become visible; pending changes are stored first
+        """
+        self.flush(wait=True)
+        for date in list(self._day_cache):
+            self._forget_day(date)
+        self._load_totals()
+        self.daily_target = self.load_daily_target()
+        self.day_start_hour = self.backend.get_setting('day_start_hour', self.day_start_hour)
+        self._update_today()
+        self.dispatch('on_days_changed', None)
+    
     def get_today_string(self):
-        """Returns today's date as string"""
-        return datetime.now().strftime('%Y-%m-%d')
+        """Returns today's date as string, recomputed only once the cached day has ended"""
+        if not self._today_start <= time.time() < self._today_end:
+            self._update_today()
+        return self._today
+    
+    def _update_today(self):
+        """Recomputes today's key and the timestamps where the day starts and ends"""
+        now = datetime.now()
+        day = (now - timedelta(hours=self.day_start_hour)).date()
+        next_day = day + timedelta(days=1)
+        # timestamp() resolves local time including DST, so a day can last 23 or 25 hours
+        self._today_start = datetime(day.year, day.month, day.day, self.day_start_hour).timestamp()
+        self._today_end = datetime(next_day.year, next_day.month, next_day.day, self.day_start_hour).timestamp()
+        self._today = day.strftime('%Y-%m-%d')
+        if self._announced_today is None:
+            self._announced_today = self._today
+        self._schedule_rollover()
+    
+    def _schedule_rollover(self):
+        """Schedules the single timer announcing the next day, right away if a rollover is pending"""
+        if self._rollover_event is not None:
+            self._rollover_event.cancel()
+        if self._today != self._announced_today:
+            delay = 0
+        else:
+            delay = min(max(self._today_end - time.time(), 0), self.MAX_ROLLOVER_WAIT)
+        self._rollover_event = Clock.schedule_once(self._on_rollover_timer, delay)
+    
+    def _on_rollover_timer(self, dt):
+        """Announces a new day once, otherwise waits for the end of the current one"""
+        self._rollover_event = None
+        today = self.get_today_string()
+        if today != self._announced_today:
+            self._announced_today = today
+            self.dispatch('on_day_rollover', today)
+        if self._rollover_event is None:
+            self._schedule_rollover()
+    
+    def set_day_start_hour(self, hour):
+        """Sets the hour (0-23) at which a new day starts and stores it with the settings"""
+        if not 0 <= hour < 24:
+            raise ValueError("Day start hour must be between 0 and 23")
+        previous_today = self._today
+        self.day_start_hour = hour
+        self.backend.set_setting('day_start_hour', hour)
+        self._update_today()
+        if self._today == previous_today:
+            # No rollover will be announced, but today's hours moved (e.g. for pacing)
+            self.dispatch('on_days_changed', [self._today])
+    
+    def get_day_start_hour(self):
+        """Returns the hour at which a new day starts"""
+        return self.day_start_hour
     
     def add_meal(self, name, calories, date=None):
         """Adds a new meal to the specified date (or today)"""
@@ -26,32 +244,317 @@ class CalorieDataManager:
         # Validate input
         if not name or not isinstance(calories, int) or calories <= 0:
             raise ValueError("Invalid meal data")
-            
-        # Initialize day if it doesn't exist
-        if not self.store.exists(date):
-            self.store.put(date, meals=[])
-        
-        # Get existing meals
-        meals = self.store.get(date)['meals']
         
         # Create new meal
         meal = {
+            'id': self._new_meal_id(date),
             'name': name,
             'calories': calories,
             'time': datetime.now().strftime('%H:%M')
         }
         
-        # Add to meals list
+        # Append to the day's meals
+        self._restore_archived_days([date])
+        self._prepare_change(date)
+        meals = self._get_cached_day(date)
         meals.append(meal)
-        self.store.put(date, meals=meals)
+        self._meal_index[meal['id']] = (date, len(meals) - 1)
+        self._update_day_total(date, meal['calories'], 1)
+        if self.flush_delay:
+            self._mark_dirty(date)
+        else:
+            self.backend.append_meal(date, meal)
         
+        self.dispatch('on_meal_added', date, meal)
         return meal
     
+    def add_meals_bulk(self, records):
+        """
+        Adds many meals at once from records with 'name', 'calories', 'date' and 'time'.
+        All records are validated before anything is stored, then written with one
+        write per affected day (one transaction on database backends).
+        Returns the number of meals added.
+        """
+        meals_by_date = {}
+        for record in records:
+            name = record.get('name')
+            calories = record.get('calories')
+            
+            # Validate input with the same rules as add_meal
+            if not name or not isinstance(calories, int) or calories <= 0:
+                raise ValueError("Invalid meal data: {}".format(record))
+            try:
+                date = record['date']
+                if not isinstance(date, str):
+                    date = date.strftime('%Y-%m-%d')
+                date = datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d')
+                time = datetime.strptime(record['time'], '%H:%M').strftime('%H:%M')
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid meal date or time: {}".format(record))
+            
+            meals_by_date.setdefault(date, []).append({
+                'id': self._new_meal_id(date),
+                'name': name,
+                'calories': calories,
+                'time': time
+            })
+        
+        self._restore_archived_days(meals_by_date)
+        for date, meals in meals_by_date.items():
+            # Cached days must see the new meals; uncached ones are read from the backend later
+            if self.flush_delay or date in self._day_cache:
+                self._prepare_change(date)  # Pins the day before more days are paged in
+                day_meals = self._get_cached_day(date)
+                day_meals.extend(meals)
+                self._index_day(date, len(day_meals) - len(meals))
+                if self.flush_delay:
+                    self._mark_dirty(date)
+            self._update_day_total(date, sum(meal['calories'] for meal in meals), len(meals))
+        
+        if not self.flush_delay and meals_by_date:
+            self.backend.append_meals(meals_by_date)
+        
+        if meals_by_date:
+            self.dispatch('on_days_changed', sorted(meals_by_date))
+        return sum(len(meals) for meals in meals_by_date.values())
+    
     def get_meals_for_date(self, date):
         """Returns list of meals for specific date"""
-        if self.store.exists(date):
-            return self.store.get(date)['meals']
-        return []
+        return list(self._get_cached_day(date))
+    
+    def get_dates(self):
+        """Returns sorted list of all dates that have data, including unflushed ones"""
+        with self._stats_lock:
+            self._load_history()
+            return sorted(self._day_totals)
+    
+    def iter_days(self, start=None, end=None, with_cold_detail=False):
+        """
+        Yields (date, meals) for every stored date in start..end ('YYYY-MM-DD', inclusive).
+        Days outside the cache are read straight from the backend without being
+        cached, so walking the whole history keeps memory flat. Rolled-up days have
+        no meals unless with_cold_detail is set; their meals then come from one scan
+        of the cold archive and are held in memory for the range.
+        A range with a start leaves the totals of older archived days unloaded.
+        Safe to call from a worker thread: the dates and the cached days are copied
+        under the statistics lock, the rest is read without it.
+        """
+        cold_days = {}
+        if with_cold_detail and self.cold_archive is not None:
+            for date, meals in self.cold_archive.iter_days():
+                if (start is not None and date < start) or (end is not None and date > end):
+                    continue
+                if meals is None:
+                    cold_days.pop(date, None)  # Cleared, only meals archived later count
+                elif date in self.rollup:
+                    # A day cleared before clears were marked left the rollup instead
+                    cold_days.setdefault(date, []).extend(meals)
+        
+        with self._stats_lock:
+            if start is None or self._history_loaded:
+                dates = self.get_dates()
+            else:
+                # A bounded range looks up archived days in it instead of loading the whole history
+                dates = sorted(set(self._day_totals).union(self.archive.get_dates(start=start),
+                                                           self.rollup.get_dates(start, end)))
+            dates = [date for date in dates
+                     if (start is None or date >= start) and (end is None or date <= end)]
+            cached = {date: list(self._day_cache[date]) for date in dates if date in self._day_cache}
+        
+        for date in dates:
+            meals = cached.pop(date) if date in cached else (self._read_day(date) or [])
+            yield date, cold_days.pop(date, []) + meals
+    
+    def _get_cached_day(self, date):
+        """Returns the cached meals list for date, loading it from the backend once"""
+        if date in self._day_cache:
+            self._day_cache.move_to_end(date)
+        else:
+            meals = self._read_day(date)
+            self._day_cache[date] = list(meals) if meals is not None else []
+            if self._assign_missing_ids(date, self._day_cache[date]):
+                self._unsaved_ids.add(date)
+            self._index_day(date)
+            self._evict_days(keep=date)
+        return self._day_cache[date]
+    
+    def _evict_days(self, keep=None):
+        """Drops least recently used clean days while more than cache_days are cached"""
+        if len(self._day_cache) <= self.cache_days:
+            return
+        
+        pinned = self._dirty_dates.keys() | {self.get_today_string(), keep}
+        for date in list(self._day_cache):
+            if len(self._day_cache) <= self.cache_days:
+                break
+            if date not in pinned:
+                self._forget_day(date)
+    
+    def _new_meal_id(self, date):
+        """Returns a new meal id for date: the day's ordinal followed by random bits"""
+        ordinal = date_type.fromisoformat(date).toordinal()
+        return self.DATED_ID_FLAG | ordinal << self.ID_RANDOM_BITS | secrets.randbits(self.ID_RANDOM_BITS)
+    
+    def _assign_missing_ids(self, date, meals):
+        """
+        Gives ids to meals of date stored before meals had them, returns True if any was
+        missing. The id holds the meal's slot instead of random bits, so every read gives
+        the same ids until they are stored; slots only move on changes, which store them first.
+        """
+        assigned = False
+        ordinal = date_type.fromisoformat(date).toordinal()
+        for slot, meal in enumerate(meals):
+            if 'id' not in meal:
+                meals[slot] = dict(meal, id=self.DATED_ID_FLAG | ordinal << self.ID_RANDOM_BITS | slot)
+                assigned = True
+        return assigned
+    
+    def _locate_meal(self, meal_id):
+        """
+        Returns (date, slot) of the meal with meal_id or None if no stored meal has it.
+        A day outside the cache is paged in: the id tells its date, older ids are
+        looked up on the day they were created and then in the whole history.
+        """
+        if meal_id not in self._meal_index:
+            if meal_id & self.DATED_ID_FLAG:
+                ordinal = (meal_id ^ self.DATED_ID_FLAG) >> self.ID_RANDOM_BITS
+                self._get_cached_day(date_type.fromordinal(ordinal).strftime('%Y-%m-%d'))
+            else:
+                created = datetime.fromtimestamp(meal_id / 1000) - timedelta(hours=self.day_start_hour)
+                self._get_cached_day(created.strftime('%Y-%m-%d'))
+                if meal_id not in self._meal_index:
+                    for date, meals in self.iter_days():
+                        if any(meal.get('id') == meal_id for meal in meals):
+                            self._get_cached_day(date)
+                            break
+        return self._meal_index.get(meal_id)
+    
+    def _save_assigned_ids(self, date):
+        """Stores ids given on read to meals of a cached day that is about to change"""
+        if date in self._unsaved_ids:
+            self._unsaved_ids.discard(date)
+            self.backend.put_day(date, list(self._day_cache[date]))
+    
+    def _index_day(self, date, start=0):
+        """Points the id index at the slots of cached meals from start onwards"""
+        meals = self._day_cache[date]
+        for slot in range(start, len(meals)):
+            self._meal_index[meals[slot]['id']] = (date, slot)
+    
+    def _forget_day(self, date):
+        """Drops a day from the cache and its meals from the id index"""
+        with self._stats_lock:
+            meals = self._day_cache.pop(date, [])
+        self._unsaved_ids.discard(date)
+        for meal in meals:
+            self._meal_index.pop(meal['id'], None)
+    
+    def _read_day(self, date):
+        """Returns meals for date from the backend, falling back to the archive"""
+        meals = self.backend.get_day(date)
+        if meals is None and self.archive is not None:
+            meals = self.archive.get_day(date)
+        return meals
+    
+    def _load_history(self):
+        """Merges totals of archived days into the totals index once"""
+        with self._stats_lock:
+            if self._history_loaded:
+                return
+        
+            totals = self.archive.get_day_totals()
+            for date, rollup_total in self.rollup.get_day_totals().items():
+                totals[date] = self._add_totals(totals.get(date, (0, 0)), rollup_total)
+            totals.update(self._day_totals)  # Days known in memory are newer than the archive
+            self._day_totals = totals
+            self._history_loaded = True
+    
+    def archive_closed_days(self):
+        """
+        Moves days before the current week from the backend into the archive.
+        Returns the number of archived days.
+        """
+        if self.archive is None:
+            return 0
+        
+        self.flush()
+        today = date_type.fromisoformat(self.get_today_string())
+        cutoff = (today - timedelta(days=today.weekday())).strftime('%Y-%m-%d')
+        dates = [date for date in self.backend.get_dates() if date < cutoff]
+        if not dates:
+            return 0
+        
+        self.archive.put_days({date: self.backend.get_day(date) or [] for date in dates})
+        self.backend.delete_days(dates)
+        for date in dates:
+            self._forget_day(date)
+        return len(dates)
+    
+    def rollup_old_days(self, retention_days):
+        """
+        Replaces meal lists of days older than retention_days with daily aggregates,
+        copying the meals to the cold archive first when it is kept.
+        Totals stay the same, so statistics do not change. Returns the number of rolled-up days.
+        """
+        if self.rollup is None:
+            return 0
+        
+        self.flush()
+        today = date_type.fromisoformat(self.get_today_string())
+        cutoff = (today - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+        archived_dates = self.archive.get_dates(before=cutoff)
+        backend_dates = [date for date in self.backend.get_dates() if date < cutoff]
+        if not archived_dates and not backend_dates:
+            return 0
+        
+        days = {date: self.archive.get_day(date) for date in archived_dates}
+        for date in backend_dates:
+            days[date] = self.backend.get_day(date) or []
+        
+        if self.cold_archive is not None:
+            self.cold_archive.append_days(days)
+        self.rollup.add_days({date: DailyRollup.aggregate(meals) for date, meals in days.items()})
+        self.archive.remove_days(archived_dates)
+        if backend_dates:
+            self.backend.delete_days(backend_dates)
+        for date in days:
+            self._forget_day(date)
+        return len(days)
+    
+    @staticmethod
+    def _add_totals(first, second):
+        """Returns the sum of two (calories, meals_count) pairs"""
+        return (first[0] + second[0], first[1] + second[1])
+    
+    def _stored_day_total(self, date):
+        """Returns (calories, meals_count) of a day that is not in the totals index"""
+        if self.archive is None:
+            return (0, 0)
+        return self._add_totals(self.archive.get_day_total(date), self.rollup.get_day_total(date))
+    
+    def _restore_archived_days(self, dates):
+        """
+        Moves archived days back into the backend before they are changed; they leave
+        the archive only once the backend has stored them
+        """
+        if self.archive is None:
+            return
+        
+        archived = [date for date in dates if date in self.archive]
+        if not archived:
+            return
+        
+        days = {}
+        for date in archived:
+            # Keep the day's totals known once it is no longer in the archive
+            with self._stats_lock:
+                self._day_totals.setdefault(date, self._stored_day_total(date))
+            if self.backend.get_day(date) is None:
+                days[date] = self.archive.get_day(date)
+        if days:
+            self.backend.put_days(days)
+            self.backend.barrier()
+        self.archive.remove_days(archived)
     
     def get_today_meals(self):
         """Returns today's meals"""
@@ -62,73 +565,356 @@ class CalorieDataManager:
         if date is None:
             date = self.get_today_string()
             
-        if not self.store.exists(date):
-            return False
-            
-        meals = self.store.get(date)['meals']
+        self._restore_archived_days([date])
+        meals = self._get_cached_day(date)
         
         if 0 <= meal_index < len(meals):
-            deleted_meal = meals.pop(meal_index)
-            self.store.put(date, meals=meals)
-            return deleted_meal
+            return self._delete_at(date, meal_index)
         
         return False
     
+    def delete_meal_by_id(self, meal_id):
+        """Deletes the meal with the given id, returns it or False if it is unknown"""
+        location = self._locate_meal(meal_id)
+        if location is None:
+            return False
+        
+        date, slot = location
+        self._restore_archived_days([date])
+        return self._delete_at(date, slot)
+    
+    def _delete_at(self, date, slot):
+        """Removes the cached meal at slot and persists the change"""
+        self._prepare_change(date)
+        meals = self._day_cache[date]
+        deleted_meal = meals.pop(slot)
+        del self._meal_index[deleted_meal['id']]
+        self._index_day(date, slot)  # Later meals moved one slot up
+        self._update_day_total(date, -deleted_meal['calories'], -1)
+        if self.flush_delay:
+            self._mark_dirty(date)
+        else:
+            self.backend.delete_meal(date, deleted_meal['id'])
+        self.dispatch('on_meal_deleted', date, deleted_meal)
+        return deleted_meal
+    
+    def update_meal(self, meal_id, name=None, calories=None):
+        """Changes name and/or calories of the meal with the given id, returns it or False if it is unknown"""
+        location = self._locate_meal(meal_id)
+        if location is None:
+            return False
+        
+        date, slot = location
+        meals = self._day_cache[date]
+        meal = dict(meals[slot])
+        if name is not None:
+            meal['name'] = name
+        if calories is not None:
+            meal['calories'] = calories
+        
+        # Validate input with the same rules as add_meal
+        if not meal['name'] or not isinstance(meal['calories'], int) or meal['calories'] <= 0:
+            raise ValueError("Invalid meal data")
+        
+        self._restore_archived_days([date])
+        self._prepare_change(date)
+        previous_meal = meals[slot]
+        meals[slot] = meal
+        self._update_day_total(date, meal['calories'] - previous_meal['calories'], 0)
+        if self.flush_delay:
+            self._mark_dirty(date)
+        else:
+            self.backend.update_meal(date, meal_id, meal)
+        self.dispatch('on_meal_updated', date, meal)
+        return meal
+    
     def clear_all_meals(self, date=None):
         """Clears all meals for specified date"""
         if date is None:
             date = self.get_today_string()
             
-        self.store.put(date, meals=[])
+        self._restore_archived_days([date])
+        self._prepare_change(date)
+        self._forget_day(date)
+        self._day_cache[date] = []
+        calories, meals_count = self.get_day_total(date)
+        if self.rollup is not None:
+            # Keep the total in the index, it no longer comes from the aggregate dropped below
+            with self._stats_lock:
+                self._day_totals[date] = (calories, meals_count)
+        self._update_day_total(date, -calories, -meals_count)
+        if self.flush_delay:
+            self._mark_dirty(date)
+        else:
+            self.backend.clear_day(date)
+        if self.rollup is not None and date in self.rollup:
+            # The aggregate and the archived meals go only after the cleared day is stored
+            self.flush(wait=True)
+            self.rollup.remove_days([date])
+            if self.cold_archive is not None:
+                self.cold_archive.clear_days([date])
+        self.dispatch('on_day_cleared', date)
+    
+    def _update_day_total(self, date, calories_delta, meals_delta):
+        """Applies a change to the per-day totals index"""
+        with self._stats_lock:
+            calories, meals_count = self.get_day_total(date)
+            self._day_totals[date] = (calories + calories_delta, meals_count + meals_delta)
+            if self._prefix_sums is not None:
+                self._prefix_sums.update(date, calories_delta, meals_delta)
+            if self._rolling_stats is not None:
+                self._rolling_stats.apply(date, calories_delta)
+            if calories_delta or meals_delta:
+                self._stats_cache.touch(date)
+                if self._streak_stats is not None:
+                    self._streak_stats.update(date, *self._day_totals[date])
+    
+    def get_day_total(self, date):
+        """Returns (calories, meals_count) for date from the totals index"""
+        if date not in self._day_totals and not self._history_loaded:
+            return self._stored_day_total(date)
+        return self._day_totals.get(date, (0, 0))
     
     def get_daily_calories(self, date=None):
         """Returns total calories consumed for specified date"""
         if date is None:
             date = self.get_today_string()
             
-        meals = self.get_meals_for_date(date)
-        return sum(meal['calories'] for meal in meals)
+        return self.get_day_total(date)[0]
     
     def get_weekly_stats(self):
         """Returns weekly statistics for the last 7 days"""
-        today = datetime.now()
-        weekly_data = []
-        total_calories = 0
+        with self._stats_lock:
+            key = ('weekly', self.get_today_string())
+            cached = self._stats_cache.get(key)
+            if cached is not None:
+                return cached
         
-        for i in range(7):
-            day = today - timedelta(days=i)
-            day_str = day.strftime('%Y-%m-%d')
+            today = datetime.strptime(self.get_today_string(), '%Y-%m-%d')
+            weekly_data = []
+            total_calories = 0
+        
+            for i in range(7):
+                day = today - timedelta(days=i)
+                day_str = day.strftime('%Y-%m-%d')
             
-            meals = self.get_meals_for_date(day_str)
-            daily_calories = sum(meal['calories'] for meal in meals)
-            total_calories += daily_calories
+                daily_calories, meals_count = self.get_day_total(day_str)
+                total_calories += daily_calories
             
-            weekly_data.append({
-                'date': day,
-                'date_str': day_str,
-                'calories': daily_calories,
-                'meals_count': len(meals),
-                'progress_percentage': (daily_calories / self.daily_target * 100) if self.daily_target > 0 else 0
-            })
+                weekly_data.append({
+                    'date': day,
+                    'date_str': day_str,
+                    'calories': daily_calories,
+                    'meals_count': meals_count,
+                    'progress_percentage': (daily_calories / self.daily_target * 100) if self.daily_target > 0 else 0
+                })
+        
+            target_weekly = 7 * self.daily_target
+            weekly_percentage = (total_calories / target_weekly * 100) if target_weekly > 0 else 0
+            avg_daily = total_calories / 7
+        
+            stats = {
+                'daily_data': list(reversed(weekly_data)),  # Oldest to newest
+                'total_calories': total_calories,
+                'target_weekly': target_weekly,
+                'weekly_percentage': weekly_percentage,
+                'avg_daily': avg_daily
+            }
+            self._stats_cache.put(key, stats['daily_data'][0]['date_str'], key[1], stats)
+            return stats
+    
+    def get_range_stats(self, start, end, bucket='day'):
+        """
+        Returns statistics for start..end (dates or 'YYYY-MM-DD') grouped by day, week or month.
+        Results are cached until a day in the range changes and must not be modified.
+        """
+        with self._stats_lock:
+            if bucket not in ('day', 'week', 'month'):
+                raise ValueError("Bucket must be 'day', 'week' or 'month'")
+            if isinstance(start, str):
+                start = date_type.fromisoformat(start)
+            if isinstance(end, str):
+                end = date_type.fromisoformat(end)
         
-        target_weekly = 7 * self.daily_target
-        weekly_percentage = (total_calories / target_weekly * 100) if target_weekly > 0 else 0
-        avg_daily = total_calories / 7
+            key = ('range', start, end, bucket)
+            cached = self._stats_cache.get(key)
+            if cached is not None:
+                return cached
         
+            if self._prefix_sums is None:
+                self._load_history()
+                self._prefix_sums = PrefixSumIndex(self._day_totals)
+        
+            buckets = []
+            bucket_start = start
+            while bucket_start <= end:
+                # Weeks start on Monday and months on the 1st, clipped to the range
+                if bucket == 'day':
+                    next_start = bucket_start + timedelta(days=1)
+                elif bucket == 'week':
+                    next_start = bucket_start + timedelta(days=7 - bucket_start.weekday())
+                else:
+                    next_start = (bucket_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+                bucket_end = min(next_start - timedelta(days=1), end)
+            
+                days = (bucket_end - bucket_start).days + 1
+                calories, meals_count = self._prefix_sums.range_sum(bucket_start, bucket_end)
+                target = days * self.daily_target
+                buckets.append({
+                    'date': bucket_start,
+                    'date_str': bucket_start.strftime('%Y-%m-%d'),
+                    'end_date': bucket_end,
+                    'days': days,
+                    'calories': calories,
+                    'meals_count': meals_count,
+                    'target': target,
+                    'avg_daily': calories / days,
+                    'progress_percentage': (calories / target * 100) if target > 0 else 0
+                })
+                bucket_start = next_start
+        
+            total_days = max((end - start).days + 1, 0)
+            total_calories = sum(item['calories'] for item in buckets)
+            target_total = total_days * self.daily_target
+        
+            stats = {
+                'bucket': bucket,
+                'buckets': buckets,  # Oldest to newest
+                'days': total_days,
+                'total_calories': total_calories,
+                'target_total': target_total,
+                'percentage': (total_calories / target_total * 100) if target_total > 0 else 0,
+                'avg_daily': total_calories / total_days if total_days > 0 else 0
+            }
+            self._stats_cache.put(key, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), stats)
+            return stats
+    
+    def get_analytics(self, with_meals=False):
+        """
+        Returns an AnalyticsEngine over the whole history; with_meals also loads
+        per-meal records, which reads every stored day (rolled-up days have none)
+        """
+        with self._stats_lock:
+            self._load_history()
+            engine = AnalyticsEngine(self._day_totals, self.daily_target)
+        if with_meals:
+            engine.load_meals(self.iter_days())
+        return engine
+    
+    def get_period_stats(self, period, start=None, end=None):
+        """
+        Returns weekly, monthly or yearly statistics with daily standard deviations
+        for start..end, by default from the first logged day to today. Results are
+        cached until a day in the range changes and must not be modified.
+        """
+        with self._stats_lock:
+            start, end = [day.strftime('%Y-%m-%d') if isinstance(day, date_type) else day
+                          for day in (start, end or self.get_today_string())]
+            key = ('period', period, start, end)
+            cached = self._stats_cache.get(key)
+            if cached is None:
+                # An open start follows the first logged day, so any earlier day invalidates it
+                cached = self.get_analytics().period_stats(period, start, end)
+                self._stats_cache.put(key, start, end, cached)
+            return cached
+    
+    def get_rolling_stats(self):
+        """
+        Returns {days: {'avg_daily', 'slope', 'trend_value'}} of the 7, 30 and 90 days
+        ending today; slope is the trend in kcal per day per day. The windows are
+        kept up to date on every meal change instead of being recomputed.
+        """
+        with self._stats_lock:
+            today = self.get_today_string()
+            if self._rolling_stats is None:
+                self._load_history()
+                self._rolling_stats = RollingStats(lambda date: self.get_day_total(date)[0], today)
+            else:
+                self._rolling_stats.move_to(today)
+            return self._rolling_stats.get_stats()
+    
+    def get_streak_stats(self):
+        """
+        Returns current and longest under-target streaks, days logged per month and
+        the share of logged days within 10% of the target. Built in one pass over
+        the day totals, then kept up to date on every meal change.
+        """
+        with self._stats_lock:
+            if self._streak_stats is None:
+                self._load_history()
+                self._streak_stats = StreakStats(self._day_totals, self.daily_target)
+            return self._streak_stats.get_stats(self.get_today_string())
+    
+    def _meal_analytics(self, start, end):
+        """Returns an AnalyticsEngine holding only the meals of start..end ('YYYY-MM-DD', inclusive)"""
+        engine = AnalyticsEngine({}, self.daily_target)
+        engine.load_meals(self.iter_days(start, end))
+        return engine
+    
+    def get_time_distribution(self, start=None, end=None):
+        """
+        Returns {'calories': 7x24, 'meals': 7x24} of the meals in start..end
+        ('YYYY-MM-DD', open ends by default) by weekday (Monday first) and hour of
+        the meal time. Rolled-up days have no meal times and are left out.
+        """
+        start, end = [day.strftime('%Y-%m-%d') if isinstance(day, date_type) else day for day in (start, end)]
+        with self._stats_lock:
+            key = ('time', start, end)
+            cached = self._stats_cache.get(key)
+            if cached is not None:
+                return cached
+            version = self._stats_cache.version
+        
+        # Meals are scanned without the lock, so changes on the main thread do not wait for
+        # the scan; the result is not cached if one of its days changed meanwhile
+        distribution = self._meal_analytics(start, end).time_distribution()
+        with self._stats_lock:
+            self._stats_cache.put(key, start, end, distribution, version)
+        return distribution
+    
+    def get_pacing(self):
+        """
+        Compares today's intake with the usual intake by this time of day, averaged
+        over the PACING_DAYS days before today that have meals. Returns consumed,
+        expected, difference (positive when ahead) and the usual daily total.
+        """
+        today = self.get_today_string()
+        key = ('pacing', today, self.day_start_hour)
+        with self._stats_lock:
+            curve = self._stats_cache.get(key)
+            version = self._stats_cache.version
+        if curve is None:
+            # The curve leaves today out, so today's meals never invalidate it
+            end = date_type.fromisoformat(today) - timedelta(days=1)
+            start = (end - timedelta(days=self.PACING_DAYS - 1)).strftime('%Y-%m-%d')
+            end = end.strftime('%Y-%m-%d')
+            curve = self._meal_analytics(start, end).intake_curve(self.day_start_hour * 60)
+            with self._stats_lock:
+                self._stats_cache.put(key, start, end, curve, version)
+        
+        # Hours since the day started, interpolated between the hourly points of the curve
+        hours = min(max((time.time() - self._today_start) / 3600, 0), 24)
+        hour = int(min(hours, 23))
+        previous = curve[hour - 1] if hour else 0
+        expected = previous + (curve[hour] - previous) * (hours - hour)
+        consumed = self.get_daily_calories(today)
         return {
-            'daily_data': list(reversed(weekly_data)),  # Oldest to newest
-            'total_calories': total_calories,
-            'target_weekly': target_weekly,
-            'weekly_percentage': weekly_percentage,
-            'avg_daily': avg_daily
+            'consumed': consumed,
+            'expected': expected,
+            'difference': consumed - expected,
+            'usual_total': curve[-1]
         }
     
     def set_daily_target(self, target):
         """Sets daily calorie target"""
         if target > 0:
-            self.daily_target = target
+            with self._stats_lock:
+                self.daily_target = target
+                self._stats_cache.clear()  # Every result holds targets
+                self._streak_stats = None
             # Save to persistent storage
-            self.store.put('settings', daily_target=target)
+            self.backend.set_setting('daily_target', target)
+            self.dispatch('on_target_changed', target)
     
     def get_daily_target(self):
         """Returns daily calorie target"""
@@ -136,7 +922,77 @@ class CalorieDataManager:
     
     def load_daily_target(self):
         """Loads daily target from storage or returns default"""
-        if self.store.exists('settings'):
-            settings = self.store.get('settings')
-            return settings.get('daily_target', 2000)
-        return 2000  # Default target
+        return self.backend.get_setting('daily_target', 2000)  # Default target
+    
+    # === Default change event handlers ===
+    
+    def on_meal_added(self, date, meal):
+        pass
+    
+    def on_meal_deleted(self, date, meal):
+        pass
+    
+    def on_meal_updated(self, date, meal):
+        pass
+    
+    def on_day_cleared(self, date):
+        pass
+    
+    def on_days_changed(self, dates):
+        pass
+    
+    def on_target_changed(self, target):
+        pass
+    
+    def on_day_rollover(self, date):
+        pass
+    
+    def _prepare_change(self, date):
+        """
+        Readies date (already restored from the archive) for a change: ids given to its
+        meals on read are stored first, as changes find meals by id, and with write-back
+        the meals before the first unflushed change are kept as the base to merge from
+        """
+        if self.flush_delay and date not in self._dirty_dates:
+            self._get_cached_day(date)
+            self._save_assigned_ids(date)
+            self._dirty_dates[date] = list(self._day_cache[date])
+        else:
+            self._save_assigned_ids(date)
+    
+    def _mark_dirty(self, date):
+        """Restarts the quiet period before flushing after date, made dirty by _prepare_change, changed"""
+        if self._flush_event is not None:
+            self._flush_event.cancel()
+        self._flush_event = Clock.schedule_once(self._on_flush_timeout, self.flush_delay)
+    
+    def _on_flush_timeout(self, dt):
+        """Flushes dirty days once the quiet period has passed"""
+        self._flush_event = None
+        self.flush()
+    
+    def flush(self, wait=False):
+        """Writes all dirty days to the backend in one batch, with wait=True also waits until they are on disk"""
+        if self._flush_event is not None:
+            self._flush_event.cancel()
+            self._flush_event = None
+        
+        if self._dirty_dates:
+            # Changes are merged into the latest stored days, keeping what other processes wrote
+            days = {date: (base, list(self._day_cache[date])) for date, base in sorted(self._dirty_dates.items())}
+            self._dirty_dates.clear()
+            self.backend.merge_days(days)
+        
+        if wait:
+            self.backend.barrier()
+    
+    def close(self):
+        """Flushes pending changes and closes the underlying storage backend and archives"""
+        if self._rollover_event is not None:
+            self._rollover_event.cancel()
+            self._rollover_event = None
+        self.flush()
+        self.backend.close()
+        for store in (self.archive, self.rollup, self.cold_archive):
+            if store is not None:
+                store.close()
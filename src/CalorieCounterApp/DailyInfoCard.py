@@ -2,6 +2,7 @@
 Daily information card component for the Calorie Counter app
 """
 
+from kivy.clock import Clock
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.widget import Widget
@@ -14,7 +15,18 @@ from src.UIUtils import UIUtils
 
 
 class DailyInfoCard(BoxLayout):
-    """Card displaying daily calorie information"""
+    """
+    Card displaying daily calorie information, redrawn on data manager change events.
+    
+    Next to "Eaten" a pacing number tells how far today's intake is ahead (+)
+    or behind (-) the usual intake by this time of day. The usual curve moves
+    on with the clock, so the card also refreshes every PACING_REFRESH seconds.
+    """
+    
+    PACING_REFRESH = 900
+    
+    # Differences within this share of the usual daily total count as on pace
+    PACING_TOLERANCE = 0.05
     
     def __init__(self, data_manager, **kwargs):
         self.data_manager = data_manager
@@ -45,6 +57,27 @@ class DailyInfoCard(BoxLayout):
 
         # Create boxes layout
         self._create_boxes()
+        self.data_manager.bind(**self._data_handlers())
+        self.update_pacing()
+        Clock.schedule_interval(lambda dt: self.update_pacing(), self.PACING_REFRESH)
+    
+    def _data_handlers(self):
+        """Returns the change event handlers of the card"""
+        return {event: self._on_data_changed for event in self.data_manager.CHANGE_EVENTS}
+    
+    def set_data_manager(self, data_manager):
+        """Moves the card over to another data manager (e.g. after a profile switch)"""
+        self.data_manager.unbind(**self._data_handlers())
+        self.data_manager = data_manager
+        self.data_manager.bind(**self._data_handlers())
+        self.update_info()
+    
+    def _on_data_changed(self, data_manager, *args):
+        """
+        Refreshes the numbers and the pacing after any change; the pacing rescans
+        the meals of the previous weeks only when one of those days changed
+        """
+        self.update_info()
         
     def _create_boxes(self):
         """Creates three boxes side by side for target, eaten, and remaining with separators"""
@@ -119,6 +152,7 @@ class DailyInfoCard(BoxLayout):
             color=consumed_color,
             size_hint_y=0.35,  # Smaller proportion
             bold=True,
+            markup=True,  # Pacing number is smaller than the title
             halign='center',
             valign='bottom'  # Align text to bottom of its space
         )
@@ -240,3 +274,14 @@ class DailyInfoCard(BoxLayout):
         self.remaining_value.text = f'{remaining} kcal'
         self.remaining_value.color = remaining_color
         self.remaining_title.color = remaining_color  # Update title color too
+        
+        self.update_pacing()
+    
+    def update_pacing(self):
+        """Shows today's intake against the usual intake by this time next to the eaten title"""
+        pacing = self.data_manager.get_pacing()
+        difference = int(round(pacing['difference']))
+        if not pacing['usual_total'] or abs(difference) <= pacing['usual_total'] * self.PACING_TOLERANCE:
+            self.consumed_title.text = 'Eaten'  # No history yet or on pace
+        else:
+            self.consumed_title.text = 'Eaten [size={}]{:+d}[/size]'.format(int(dp(11)), difference)
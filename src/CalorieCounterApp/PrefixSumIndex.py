@@ -0,0 +1,69 @@
+"""
+Cumulative daily totals for the Calorie Counter app
+Answers calorie and meal count sums over any date range in constant time
+"""
+
+from datetime import date as date_type
+
+
+class PrefixSumIndex:
+    """
+    Prefix sums of per-day calories and meal counts over consecutive days.
+
+    Entry i holds the sum of all days before origin + i, so any range sum is a
+    difference of two entries. Changing a day shifts the entries after it;
+    edits almost always hit today, which is the last entry, so they stay cheap.
+    """
+
+    def __init__(self, day_totals):
+        ordinals = {self.to_ordinal(day): total for day, total in day_totals.items()}
+        today = date_type.today().toordinal()
+        self.origin = min(list(ordinals) + [today])
+        size = max(list(ordinals) + [today]) - self.origin + 2
+        self.calories = [0] * size
+        self.meals = [0] * size
+
+        for ordinal, (calories, meals_count) in ordinals.items():
+            self.calories[ordinal - self.origin + 1] = calories
+            self.meals[ordinal - self.origin + 1] = meals_count
+
+        # Turn per-day values into running sums in a single pass
+        for i in range(1, size):
+            self.calories[i] += self.calories[i - 1]
+            self.meals[i] += self.meals[i - 1]
+
+    @staticmethod
+    def to_ordinal(day):
+        """Returns the proleptic ordinal of a date object or 'YYYY-MM-DD' string"""
+        if isinstance(day, str):
+            return date_type.fromisoformat(day).toordinal()
+        return day.toordinal()
+
+    def _extend_to(self, ordinal):
+        """Grows the index so it covers the given day"""
+        if ordinal < self.origin:
+            # Backfilled day before the first known one: prepend empty days
+            padding = self.origin - ordinal
+            self.calories = [0] * padding + self.calories
+            self.meals = [0] * padding + self.meals
+            self.origin = ordinal
+        missing = ordinal - self.origin + 2 - len(self.calories)
+        if missing > 0:
+            self.calories.extend([self.calories[-1]] * missing)
+            self.meals.extend([self.meals[-1]] * missing)
+
+    def update(self, day, calories_delta, meals_delta):
+        """Applies a change of one day's totals"""
+        ordinal = self.to_ordinal(day)
+        self._extend_to(ordinal)
+        for i in range(ordinal - self.origin + 1, len(self.calories)):
+            self.calories[i] += calories_delta
+            self.meals[i] += meals_delta
+
+    def range_sum(self, start, end):
+        """Returns (calories, meals_count) summed over start..end inclusive"""
+        first = max(self.to_ordinal(start) - self.origin, 0)
+        last = min(self.to_ordinal(end) - self.origin + 1, len(self.calories) - 1)
+        if last <= first:
+            return 0, 0
+        return self.calories[last] - self.calories[first], self.meals[last] - self.meals[first]
@@ -0,0 +1,117 @@
+"""
+Profile management for the Calorie Counter app
+Keeps a separate data partition per person and switches between them
+"""
+
+import os
+import re
+
+from src.Storage.AtomicJsonStore import AtomicJsonStore
+
+from src.CalorieCounterApp.CalorieDataManager import CalorieDataManager
+from src.Storage.PersistenceWorker import PersistenceWorker
+
+
+class ProfileManager:
+    """
+    Registry of profiles, each with its own data files and settings (daily target).
+
+    The registry (profile ids, names and the active profile) is a small file of
+    its own, so listing profiles never touches meal data. A profile's data
+    manager is opened on first use and stays open, so switching back and forth
+    does not reparse anything. All open profiles share one persistence worker
+    thread for their writes.
+    """
+
+    DEFAULT_PROFILE = 'default'
+
+    def __init__(self, root='.', extension='.json', write_queue_size=0, **manager_options):
+        self.root = root
+        self.extension = extension
+        self.manager_options = manager_options
+        self.write_worker = PersistenceWorker(write_queue_size) if write_queue_size else None
+        self._data_managers = {}
+
+        self.store = AtomicJsonStore(os.path.join(root, 'profiles.json'))
+        if self.store.exists('registry'):
+            registry = self.store.get('registry')
+            self.profiles = dict(registry['profiles'])
+            self.active_profile = registry['active']
+        else:
+            self.profiles = {self.DEFAULT_PROFILE: 'Default'}
+            self.active_profile = self.DEFAULT_PROFILE
+
+    def _save_registry(self):
+        """Stores profile names and the active profile"""
+        self.store.put('registry', profiles=self.profiles, active=self.active_profile)
+
+    def get_data_path(self, profile_id):
+        """Returns the data file of a profile; the default profile keeps the original location"""
+        filename = 'calorie_data' + self.extension
+        if profile_id == self.DEFAULT_PROFILE:
+            return os.path.join(self.root, filename)
+        return os.path.join(self.root, 'profiles', profile_id, filename)
+
+    def list_profiles(self):
+        """Returns list of (profile_id, name) in creation order"""
+        return list(self.profiles.items())
+
+    def create_profile(self, name):
+        """Registers a new profile and returns its id"""
+        name = name.strip()
+        if not name:
+            raise ValueError("Profile name cannot be empty")
+        if name in self.profiles.values():
+            raise ValueError("Profile already exists: {}".format(name))
+
+        base_id = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'profile'
+        profile_id, suffix = base_id, 2
+        while profile_id in self.profiles:
+            profile_id = '{}-{}'.format(base_id, suffix)
+            suffix += 1
+
+        os.makedirs(os.path.dirname(self.get_data_path(profile_id)), exist_ok=True)
+        self.profiles[profile_id] = name
+        self._save_registry()
+        return profile_id
+
+    def get_data_manager(self, profile_id=None):
+        """Returns the data manager of a profile (the active one by default), opening it once"""
+        if profile_id is None:
+            profile_id = self.active_profile
+        if profile_id not in self.profiles:
+            raise ValueError("Unknown profile: {}".format(profile_id))
+
+        if profile_id not in self._data_managers:
+            self._data_managers[profile_id] = CalorieDataManager(
+                self.get_data_path(profile_id),
+                write_worker=self.write_worker,
+                **self.manager_options
+            )
+        return self._data_managers[profile_id]
+
+    def switch_profile(self, profile_id):
+        """Makes profile_id the active profile and returns its data manager"""
+        data_manager = self.get_data_manager(profile_id)
+        if profile_id != self.active_profile:
+            self.active_profile = profile_id
+            self._save_registry()
+        return data_manager
+
+    def close_profile(self, profile_id):
+        """Flushes and closes a profile's data manager if it is open"""
+        data_manager = self._data_managers.pop(profile_id, None)
+        if data_manager is not None:
+            data_manager.close()
+
+    def flush(self, wait=False):
+        """Flushes pending changes of all open profiles"""
+        for data_manager in self._data_managers.values():
+            data_manager.flush(wait=wait)
+
+    def close(self):
+        """Closes all open profiles and stops the shared persistence worker"""
+        for profile_id in list(self._data_managers):
+            self.close_profile(profile_id)
+        if self.write_worker is not None:
+            self.write_worker.stop()
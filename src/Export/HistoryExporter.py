@@ -0,0 +1,90 @@
+"""
+History export for the Calorie Counter app
+Streams every stored meal as CSV or NDJSON lines
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+
+class HistoryExporter:
+    """Streams meal history from a CalorieDataManager through generators"""
+
+    FORMATS = ('csv', 'ndjson')
+    FIELDS = ['date', 'time', 'name', 'calories']
+
+    def __init__(self, data_manager):
+        self.data_manager = data_manager
+
+    def iter_meals(self, start=None, end=None, since=None):
+        """
+        Yields meal dicts with their date, oldest first, including meals of
+        rolled-up days kept in the cold archive.
+        start/end limit the dates ('YYYY-MM-DD', inclusive) and since (datetime)
+        keeps only meals eaten at or after that moment. Meals logged before the
+        day start hour were eaten on the calendar day after their date.
+        """
+        day_start_hour = self.data_manager.get_day_start_hour()
+        if since is not None:
+            first_date = (since - timedelta(hours=day_start_hour)).strftime('%Y-%m-%d')
+            if start is None or start < first_date:
+                start = first_date
+
+        for date, meals in self.data_manager.iter_days(start, end, with_cold_detail=True):
+            for meal in meals:
+                if since is not None:
+                    eaten_at = datetime.strptime('{} {}'.format(date, meal['time']), '%Y-%m-%d %H:%M')
+                    if eaten_at.hour < day_start_hour:
+                        eaten_at += timedelta(days=1)
+                    if eaten_at < since:
+                        continue
+                yield {
+                    'date': date,
+                    'time': meal['time'],
+                    'name': meal['name'],
+                    'calories': meal['calories']
+                }
+
+    def iter_lines(self, export_format='csv', start=None, end=None, since=None):
+        """Yields the export line by line in the given format"""
+        if export_format not in self.FORMATS:
+            raise ValueError("Unsupported export format: {}".format(export_format))
+
+        meals = self.iter_meals(start, end, since)
+        if export_format == 'ndjson':
+            for meal in meals:
+                yield json.dumps(meal, ensure_ascii=False) + '\n'
+            return
+
+        # CSV rows are rendered one at a time through a reused buffer
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.FIELDS, lineterminator='\n')
+        writer.writeheader()
+        yield self._take(buffer)
+        for meal in meals:
+            writer.writerow(meal)
+            yield self._take(buffer)
+
+    @staticmethod
+    def _take(buffer):
+        """Returns buffered text and empties the buffer"""
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    def export_to_stream(self, stream, export_format='csv', start=None, end=None, since=None):
+        """Writes the export to an open text stream, returns number of meals written"""
+        count = 0
+        for line in self.iter_lines(export_format, start, end, since):
+            stream.write(line)
+            count += 1
+        # The CSV header is a line too
+        return count - 1 if export_format == 'csv' else count
+
+    def export_to_file(self, path, export_format='csv', start=None, end=None, since=None):
+        """Writes the export to a file, returns number of meals written"""
+        with open(path, 'w', encoding='utf-8', newline='') as export_file:
+            return self.export_to_stream(export_file, export_format, start, end, since)
@@ -15,6 +15,7 @@ class MealCard(BoxLayout):
     """Card representing a single meal"""
     def __init__(self, meal_data, delete_callback, **kwargs):
         super().__init__(**kwargs)
+        self.meal_data = meal_data
         self.orientation = 'horizontal'
         self.size_hint_y = None
         self.height = dp(60)
@@ -13,14 +13,66 @@ from src.UIUtils import UIUtils
 
 
 class MealManager:
-    """Handles all meal-related operations and display logic"""
+    """
+    Handles all meal-related operations and display logic.
     
-    def __init__(self, data_manager, meals_layout, meal_name_input, calories_input, update_daily_info_callback):
+    Meal cards follow the data manager's change events, so meals added or
+    removed anywhere (not only through this list) show up without polling.
+    """
+    
+    def __init__(self, data_manager, meals_layout, meal_name_input, calories_input):
         self.data_manager = data_manager
         self.meals_layout = meals_layout
         self.meal_name_input = meal_name_input
         self.calories_input = calories_input
-        self.update_daily_info_callback = update_daily_info_callback
+        self.meal_cards = {}  # Displayed cards by meal id
+        self.data_manager.bind(**self._data_handlers())
+    
+    def _data_handlers(self):
+        """Returns the change event handlers of the meal list"""
+        return {
+            'on_meal_added': self._on_meal_added,
+            'on_meal_deleted': self._on_meal_deleted,
+            'on_meal_updated': self._on_day_changed,
+            'on_day_cleared': self._on_day_changed,
+            'on_days_changed': self._on_days_changed,
+            'on_day_rollover': self._on_day_rollover
+        }
+    
+    def set_data_manager(self, data_manager):
+        """Shows the meals of another data manager (e.g. after a profile switch)"""
+        self.data_manager.unbind(**self._data_handlers())
+        self.data_manager = data_manager
+        self.data_manager.bind(**self._data_handlers())
+        self.load_today_meals()
+    
+    def _is_today(self, date):
+        """Returns True if date is the day shown in the list"""
+        return date == self.data_manager.get_today_string()
+    
+    def _on_meal_added(self, data_manager, date, meal):
+        """Adds a card for a meal added to today"""
+        if self._is_today(date) and meal['id'] not in self.meal_cards:
+            self._add_meal_card(meal)
+    
+    def _on_meal_deleted(self, data_manager, date, meal):
+        """Removes the card of a meal deleted from today"""
+        if self._is_today(date):
+            self._remove_meal_card(meal['id'])
+    
+    def _on_day_changed(self, data_manager, date, *args):
+        """Reloads the list when today's meals changed as a whole"""
+        if self._is_today(date):
+            self.load_today_meals()
+    
+    def _on_day_rollover(self, data_manager, date):
+        """Shows the meals of the day that has just started"""
+        self.load_today_meals()
+    
+    def _on_days_changed(self, data_manager, dates):
+        """Reloads the list when today is among the changed days (None means any day)"""
+        if dates is None or any(self._is_today(date) for date in dates):
+            self.load_today_meals()
     
     def add_meal(self, instance):
         """Adds a new meal"""
@@ -40,17 +92,13 @@ class MealManager:
             return
         
         try:
-            # Add meal using data manager
-            meal = self.data_manager.add_meal(meal_name, calories)
+            # Add meal using data manager; its card comes with the change event
+            self.data_manager.add_meal(meal_name, calories)
             
             # Clear input fields
             self.meal_name_input.text = ''
             self.calories_input.text = ''
             
-            # Refresh display
-            self.load_today_meals()
-            self.update_daily_info_callback()
-            
             UIUtils.show_popup('Success', f'Added meal: {meal_name} ({calories} kcal)')
             
         except ValueError as e:
@@ -59,6 +107,7 @@ class MealManager:
     def load_today_meals(self):
         """Loads and displays today's meals as beautiful cards"""
         self.meals_layout.clear_widgets()
+        self.meal_cards = {}
         
         meals = self.data_manager.get_today_meals()
         
@@ -67,17 +116,34 @@ class MealManager:
             empty_card = self._create_empty_meals_card()
             self.meals_layout.add_widget(empty_card)
         else:
-            for i, meal in enumerate(meals):
-                # Use inner function to properly close the index
-                def create_meal_card(index, meal_data):
-                    meal_card = MealCard(
-                        meal_data=meal_data,
-                        delete_callback=lambda x: self.delete_meal(index)
-                    )
-                    return meal_card
-                
-                meal_card = create_meal_card(i, meal)
-                self.meals_layout.add_widget(meal_card)
+            for meal in meals:
+                self._add_meal_card(meal)
+    
+    def _add_meal_card(self, meal):
+        """Appends a card for a single meal, replacing the empty message if shown"""
+        if not self.meal_cards:
+            self.meals_layout.clear_widgets()
+        
+        # Use inner function to properly close the meal id
+        def create_meal_card(meal_id, meal_data):
+            meal_card = MealCard(
+                meal_data=meal_data,
+                delete_callback=lambda x: self.delete_meal(meal_id)
+            )
+            return meal_card
+        
+        meal_card = create_meal_card(meal['id'], meal)
+        self.meal_cards[meal['id']] = meal_card
+        self.meals_layout.add_widget(meal_card)
+    
+    def _remove_meal_card(self, meal_id):
+        """Removes the card of a single meal, showing the empty message after the last one"""
+        meal_card = self.meal_cards.pop(meal_id, None)
+        if meal_card is not None:
+            self.meals_layout.remove_widget(meal_card)
+        if not self.meal_cards:
+            self.meals_layout.clear_widgets()
+            self.meals_layout.add_widget(self._create_empty_meals_card())
     
     def _create_empty_meals_card(self):
         """Creates empty meals message card"""
@@ -115,8 +181,6 @@ class MealManager:
         """Deletes all meals from today"""
         def confirm_clear():
             self.data_manager.clear_all_meals()
-            self.load_today_meals()
-            self.update_daily_info_callback()
         
         UIUtils.show_popup(
             'Confirmation', 
@@ -127,18 +191,15 @@ class MealManager:
             cancel_text='Cancel'
         )
     
-    def delete_meal(self, meal_index):
+    def delete_meal(self, meal_id):
         """Deletes meal from list with confirmation"""
-        meals = self.data_manager.get_today_meals()
+        meal_card = self.meal_cards.get(meal_id)
         
-        if 0 <= meal_index < len(meals):
-            meal_to_delete = meals[meal_index]
+        if meal_card is not None:
+            meal_to_delete = meal_card.meal_data
             
             def confirm_delete():
-                deleted_meal = self.data_manager.delete_meal(meal_index)
-                if deleted_meal:
-                    self.load_today_meals()
-                    self.update_daily_info_callback()
+                self.data_manager.delete_meal_by_id(meal_id)
             
             UIUtils.show_popup(
                 'Confirmation',
@@ -0,0 +1,83 @@
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.spinner import Spinner
+from kivy.metrics import dp
+
+from src.SettingsDisplay.BaseSettingsOption import BaseSettingsOption
+from src.Styled.StyledButton import StyledButton
+from src.consts import Colors
+
+
+class DayStartOption(BaseSettingsOption):
+    """
+    Opcja godziny rozpoczęcia dnia.
+    Dziedziczy z BaseSettingsOption strukturę: tytuł, pole, przycisk.
+    Posiłki zjedzone po północy, ale przed tą godziną, liczą się do poprzedniego dnia.
+    """
+
+    HOURS = range(0, 7)
+
+    def __init__(self, data_manager=None, **kwargs):
+        self.data_manager = data_manager
+        self.selected_hour = data_manager.get_day_start_hour() if data_manager else 0
+        super().__init__(option_title="Day Starts At", **kwargs)
+
+    # === Implementacja BaseSettingsOption ===
+
+    def create_value_display(self):
+        """Tworzy listę wyboru godziny"""
+        container = BoxLayout(
+            size_hint_x=0.6,
+            size_hint_y=None,
+            height=dp(40),
+            padding=[dp(8), dp(4)],
+            orientation='vertical'
+        )
+
+        self.hour_spinner = Spinner(
+            text=self.format_hour(self.selected_hour),
+            values=[self.format_hour(hour) for hour in self.HOURS],
+            size_hint_y=None,
+            height=dp(32)
+        )
+        self.hour_spinner.bind(text=lambda instance, text: self.select_hour(text))
+        container.add_widget(self.hour_spinner)
+        return container
+
+    def create_action_button(self):
+        """Tworzy przycisk 'Save' zapisujący wybraną godzinę"""
+        save_button = StyledButton(
+            text="Save",
+            size_hint_x=0.4,
+            size_hint_y=None,
+            height=dp(40),
+            bg_color=Colors.ORANGE
+        )
+        save_button.bind(on_press=lambda *_: self.set_option_value(self.selected_hour))
+        return save_button
+
+    def get_option_value(self):
+        """Zwraca godzinę rozpoczęcia dnia zapisaną w data managerze"""
+        return self.data_manager.get_day_start_hour() if self.data_manager else self.selected_hour
+
+    def set_option_value(self, value):
+        """Zapisuje godzinę rozpoczęcia dnia"""
+        self.selected_hour = value
+        if self.data_manager and value != self.data_manager.get_day_start_hour():
+            self.data_manager.set_day_start_hour(value)
+        self.update_value_display()
+
+    def update_value_display(self):
+        """Aktualizuje wyświetlaną godzinę"""
+        if hasattr(self, 'hour_spinner'):
+            self.hour_spinner.text = self.format_hour(self.selected_hour)
+
+    # === Pomocnicze ===
+
+    @staticmethod
+    def format_hour(hour):
+        """Zwraca godzinę w formacie 'HH:00'"""
+        return '{:02d}:00'.format(hour)
+
+    def select_hour(self, text):
+        """Zapamiętuje godzinę wybraną z listy (zapis dopiero po 'Save')"""
+        self.selected_hour = int(text.split(':')[0])
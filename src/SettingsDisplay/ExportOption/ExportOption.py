@@ -0,0 +1,98 @@
+import os
+from datetime import datetime
+
+from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.spinner import Spinner
+from kivy.metrics import dp
+
+from src.SettingsDisplay.BaseSettingsOption import BaseSettingsOption
+from src.Export.HistoryExporter import HistoryExporter
+from src.Styled.StyledButton import StyledButton
+from src.UIUtils import UIUtils
+from src.consts import Colors
+
+
+class ExportOption(BaseSettingsOption):
+    """
+    Opcja eksportu całej historii posiłków.
+    Dziedziczy z BaseSettingsOption strukturę: tytuł, pole, przycisk.
+    Pole pozwala wybrać format (CSV / NDJSON), przycisk zapisuje plik.
+    """
+
+    def __init__(self, data_manager=None, **kwargs):
+        self.data_manager = data_manager
+        self.export_format = HistoryExporter.FORMATS[0]
+        super().__init__(option_title="Data Export", **kwargs)
+
+    # === Implementacja BaseSettingsOption ===
+
+    def create_value_display(self):
+        """Tworzy listę wyboru formatu eksportu"""
+        container = BoxLayout(
+            size_hint_x=0.6,
+            size_hint_y=None,
+            height=dp(40),
+            padding=[dp(8), dp(4)],
+            orientation='vertical'
+        )
+
+        self.format_spinner = Spinner(
+            text=self.export_format.upper(),
+            values=[export_format.upper() for export_format in HistoryExporter.FORMATS],
+            size_hint_y=None,
+            height=dp(32)
+        )
+        self.format_spinner.bind(text=lambda instance, text: self.set_option_value(text.lower()))
+        container.add_widget(self.format_spinner)
+        return container
+
+    def create_action_button(self):
+        """Tworzy przycisk 'Export' zapisujący historię do pliku"""
+        export_button = StyledButton(
+            text="Export",
+            size_hint_x=0.4,
+            size_hint_y=None,
+            height=dp(40),
+            bg_color=Colors.ORANGE
+        )
+        export_button.bind(on_press=lambda *_: self.export_history())
+        return export_button
+
+    def get_option_value(self):
+        """Zwraca wybrany format eksportu"""
+        return self.export_format
+
+    def set_option_value(self, value):
+        """Ustawia format eksportu"""
+        if value in HistoryExporter.FORMATS:
+            self.export_format = value
+            self.update_value_display()
+
+    def update_value_display(self):
+        """Aktualizuje wyświetlany format"""
+        if hasattr(self, 'format_spinner'):
+            self.format_spinner.text = self.export_format.upper()
+
+    # === Eksport ===
+
+    def get_export_path(self):
+        """Zwraca ścieżkę pliku eksportu w katalogu danych aplikacji"""
+        app = App.get_running_app()
+        directory = app.user_data_dir if app else os.getcwd()
+        filename = 'calorie_export_{}.{}'.format(datetime.now().strftime('%Y%m%d_%H%M'), self.export_format)
+        return os.path.join(directory, filename)
+
+    def export_history(self):
+        """Eksportuje całą historię do pliku i pokazuje wynik"""
+        if not self.data_manager:
+            return
+
+        path = self.get_export_path()
+        try:
+            count = HistoryExporter(self.data_manager).export_to_file(path, self.export_format)
+        except OSError as e:
+            UIUtils.show_popup('Error', 'Export failed:\n{}'.format(e))
+            return
+
+        UIUtils.show_popup('Success', 'Exported {} meals to\n{}'.format(count, path))
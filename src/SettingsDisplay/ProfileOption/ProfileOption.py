@@ -0,0 +1,136 @@
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.popup import Popup
+from kivy.uix.spinner import Spinner
+from kivy.metrics import dp
+
+from src.SettingsDisplay.BaseSettingsOption import BaseSettingsOption
+from src.Styled.StyledButton import StyledButton
+from src.Styled.StyledTextInput import StyledTextInput
+from src.UIUtils import UIUtils
+from src.consts import Colors
+
+
+class ProfileOption(BaseSettingsOption):
+    """
+    Opcja wyboru profilu użytkownika.
+    Dziedziczy z BaseSettingsOption strukturę: tytuł, pole, przycisk.
+    Pole to lista profili (wybór przełącza profil), przycisk tworzy nowy profil.
+    """
+
+    def __init__(self, profile_manager=None, on_profile_change=None, **kwargs):
+        self.profile_manager = profile_manager
+        self.on_profile_change = on_profile_change
+        self.popup = None
+        super().__init__(option_title="Profile", **kwargs)
+
+    # === Implementacja BaseSettingsOption ===
+
+    def create_value_display(self):
+        """Tworzy listę wyboru profilu"""
+        container = BoxLayout(
+            size_hint_x=0.6,
+            size_hint_y=None,
+            height=dp(40),
+            padding=[dp(8), dp(4)],
+            orientation='vertical'
+        )
+
+        self.profile_spinner = Spinner(size_hint_y=None, height=dp(32))
+        self.update_value_display()
+        self.profile_spinner.bind(text=lambda instance, text: self.select_profile_name(text))
+        container.add_widget(self.profile_spinner)
+        return container
+
+    def create_action_button(self):
+        """Tworzy przycisk 'New' otwierający popup nowego profilu"""
+        new_button = StyledButton(
+            text="New",
+            size_hint_x=0.4,
+            size_hint_y=None,
+            height=dp(40),
+            bg_color=Colors.ORANGE
+        )
+        new_button.bind(on_press=lambda *_: self.show_popup())
+        return new_button
+
+    def get_option_value(self):
+        """Zwraca id aktywnego profilu"""
+        return self.profile_manager.active_profile if self.profile_manager else None
+
+    def set_option_value(self, value):
+        """Przełącza na profil o podanym id"""
+        if not self.profile_manager or value == self.profile_manager.active_profile:
+            return
+        self.profile_manager.switch_profile(value)
+        self.update_value_display()
+        if self.on_profile_change:
+            self.on_profile_change(value)
+
+    def update_value_display(self):
+        """Aktualizuje listę profili i zaznaczony profil"""
+        if not self.profile_manager or not hasattr(self, 'profile_spinner'):
+            return
+        profiles = self.profile_manager.list_profiles()
+        self.profile_spinner.values = [name for _, name in profiles]
+        self.profile_spinner.text = dict(profiles)[self.profile_manager.active_profile]
+
+    def select_profile_name(self, name):
+        """Przełącza na profil wybrany z listy po nazwie"""
+        for profile_id, profile_name in self.profile_manager.list_profiles():
+            if profile_name == name:
+                self.set_option_value(profile_id)
+                return
+
+    # === Popup nowego profilu ===
+
+    def show_popup(self):
+        """Pokazuje popup z polem nazwy nowego profilu"""
+        if self.popup:
+            self.popup.dismiss()
+
+        content = BoxLayout(orientation='vertical', spacing=dp(10), padding=[dp(20), dp(10)])
+
+        self.name_input = StyledTextInput(
+            hint_text='Profile name',
+            multiline=False,
+            size_hint_y=None,
+            height=dp(40)
+        )
+        content.add_widget(self.name_input)
+
+        button_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(50), spacing=dp(10))
+
+        cancel_btn = StyledButton(text="Cancel", bg_color=Colors.GRAY)
+        cancel_btn.bind(on_press=lambda *_: self.dismiss_popup())
+        button_layout.add_widget(cancel_btn)
+
+        create_btn = StyledButton(text="Create", bg_color=Colors.ORANGE)
+        create_btn.bind(on_press=lambda *_: self.create_profile())
+        button_layout.add_widget(create_btn)
+
+        content.add_widget(button_layout)
+
+        self.popup = Popup(
+            title='New Profile',
+            content=content,
+            size_hint=(0.8, 0.35),
+            separator_height=0
+        )
+        self.popup.open()
+
+    def dismiss_popup(self):
+        """Zamyka popup"""
+        if self.popup:
+            self.popup.dismiss()
+            self.popup = None
+
+    def create_profile(self):
+        """Tworzy profil z wpisanej nazwy i od razu na niego przełącza"""
+        try:
+            profile_id = self.profile_manager.create_profile(self.name_input.text)
+        except ValueError as e:
+            UIUtils.show_popup('Error', str(e))
+            return
+
+        self.dismiss_popup()
+        self.set_option_value(profile_id)
@@ -10,13 +10,18 @@ from kivy.metrics import dp
 from src.Styled.BaseDisplayStyle import BaseDisplayStyle
 from src.consts import Colors
 from src.SettingsDisplay.SetTargetOption.SetTargetOption import SetTargetOption
+from src.SettingsDisplay.ExportOption.ExportOption import ExportOption
+from src.SettingsDisplay.ProfileOption.ProfileOption import ProfileOption
+from src.SettingsDisplay.DayStartOption.DayStartOption import DayStartOption
 
 
 class SettingsDisplay(BaseDisplayStyle):
     """Handles settings display using base display style"""
     
-    def __init__(self, data_manager=None):
+    def __init__(self, data_manager=None, profile_manager=None, on_profile_change=None):
         super().__init__(data_manager)
+        self.profile_manager = profile_manager
+        self.on_profile_change = on_profile_change
         
     @property
     def title_text(self):
@@ -46,10 +51,26 @@ class SettingsDisplay(BaseDisplayStyle):
         )
         content_container.bind(minimum_height=content_container.setter('height'))
         
+        # Opcja wyboru profilu
+        if self.profile_manager:
+            self.profile_option = ProfileOption(
+                profile_manager=self.profile_manager,
+                on_profile_change=self.on_profile_changed
+            )
+            content_container.add_widget(self.profile_option)
+        
         # Opcja ustawienia celu kalorycznego
         self.target_option = SetTargetOption(on_value_change=self.on_target_changed)
         content_container.add_widget(self.target_option)
         
+        # Opcja godziny rozpoczęcia dnia
+        self.day_start_option = DayStartOption(data_manager=self.data_manager)
+        content_container.add_widget(self.day_start_option)
+        
+        # Opcja eksportu historii posiłków
+        self.export_option = ExportOption(data_manager=self.data_manager)
+        content_container.add_widget(self.export_option)
+        
         # Separator dla przyszłych opcji
         separator = Label(
             text='',
@@ -60,7 +81,7 @@ class SettingsDisplay(BaseDisplayStyle):
         
         # Placeholder dla przyszłych ustawień
         future_settings_label = Label(
-            text='[color=666666]More settings coming soon:\n• Theme preferences\n• Data export options\n• Notification settings[/color]',
+            text='[color=666666]More settings coming soon:\n• Theme preferences\n• Notification settings[/color]',
             font_size=dp(14),
             markup=True,
             size_hint_y=None,
@@ -87,6 +108,23 @@ class SettingsDisplay(BaseDisplayStyle):
             current_target = self.data_manager.get_daily_target()
             if current_target:
                 self.target_option.set_option_value(current_target)
+        if self.data_manager and hasattr(self, 'day_start_option'):
+            self.day_start_option.selected_hour = self.data_manager.get_day_start_hour()
+            self.day_start_option.update_value_display()
+    
+    def set_data_manager(self, data_manager):
+        """Podmienia data managera (np. po zmianie profilu)"""
+        self.data_manager = data_manager
+        if hasattr(self, 'export_option'):
+            self.export_option.data_manager = data_manager
+        if hasattr(self, 'day_start_option'):
+            self.day_start_option.data_manager = data_manager
+        self.load_current_settings()
+    
+    def on_profile_changed(self, profile_id):
+        """Callback wywoływany gdy zmieni się aktywny profil"""
+        if self.on_profile_change:
+            self.on_profile_change(profile_id)
     
     def on_target_changed(self, new_target):
         """Callback wywoływany gdy zmieni się cel kaloryczny"""
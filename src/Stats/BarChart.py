@@ -0,0 +1,132 @@
+"""
+Bar chart widget for the Calorie Counter app
+Draws a whole period of calorie bars in one batched instruction group
+"""
+
+from kivy.uix.widget import Widget
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, InstructionGroup, Line, Mesh, Rectangle
+from kivy.metrics import dp
+
+from src.UIUtils import UIUtils
+from src.consts import Colors
+
+
+class BarChart(Widget):
+    """
+    Average daily calories of each day or bucket as bars against the daily target.
+    
+    All geometry lives in one InstructionGroup on the canvas: bars are
+    collected into one triangle mesh per progress color, followed by the axis,
+    its ticks, the dashed target line and three small text textures. The group
+    is rebuilt only when set_data is called or the widget moves or resizes,
+    so a year of daily bars costs a handful of draw calls instead of hundreds
+    of widgets.
+    """
+    
+    BAR_GAP = 0.25  # Share of every slot left empty between bars
+    HEADROOM = 1.1  # Scale top relative to the larger of the highest bar and the target
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.values = []
+        self.percentages = []
+        self.target = 0
+        self.first_label = self.last_label = ''
+        self.tick_positions = []
+        
+        self._group = InstructionGroup()
+        self.canvas.add(self._group)
+        self.bind(pos=self._redraw, size=self._redraw)
+    
+    def set_data(self, buckets, first_label='', last_label='', tick_positions=()):
+        """
+        Shows buckets of get_range_stats/get_period_stats (oldest first); ticks are
+        drawn under the bars at tick_positions, e.g. the first day of every month
+        """
+        self.values = [bucket['avg_daily'] for bucket in buckets]
+        self.percentages = [bucket['progress_percentage'] for bucket in buckets]
+        self.target = buckets[0]['target'] / buckets[0]['days'] if buckets else 0
+        self.first_label, self.last_label = first_label, last_label
+        self.tick_positions = list(tick_positions)
+        self._redraw()
+    
+    # === Geometry ===
+    
+    def _plot_area(self):
+        """Returns (x, y, width, height) of the area the bars are drawn in"""
+        left, bottom = dp(34), dp(16)
+        return (self.x + left, self.y + bottom,
+                max(self.width - left - dp(4), 0), max(self.height - bottom - dp(4), 0))
+    
+    def _scale_top(self):
+        """Returns the calorie value at the top of the plot area"""
+        return max(max(self.values, default=0), self.target, 1) * self.HEADROOM
+    
+    def build_meshes(self):
+        """
+        Returns {color: (vertices, indices)} of the bars grouped by progress color;
+        vertices are x, y, u, v as Mesh expects
+        """
+        x, y, width, height = self._plot_area()
+        meshes = {}
+        if not self.values or width <= 0 or height <= 0:
+            return meshes
+        
+        slot = width / len(self.values)
+        bar_width = max(slot * (1 - self.BAR_GAP), 1)
+        top = self._scale_top()
+        for i, (value, percentage) in enumerate(zip(self.values, self.percentages)):
+            if value <= 0:
+                continue
+            left = x + i * slot + (slot - bar_width) / 2
+            right = left + bar_width
+            bar_top = y + height * value / top
+            vertices, indices = meshes.setdefault(tuple(UIUtils.get_color_based_on_progress(percentage)), ([], []))
+            first = len(vertices) // 4
+            vertices.extend((left, y, 0, 0, right, y, 0, 0, right, bar_top, 0, 0, left, bar_top, 0, 0))
+            indices.extend((first, first + 1, first + 2, first, first + 2, first + 3))
+        return meshes
+    
+    def _text(self, text, x, y, anchor_right=False):
+        """Adds a small text texture with its lower left (or lower right) corner at x, y"""
+        label = CoreLabel(text=text, font_size=dp(9), color=Colors.GRAY)
+        label.refresh()
+        texture = label.texture
+        if anchor_right:
+            x -= texture.width
+        self._group.add(Color(1, 1, 1, 1))
+        self._group.add(Rectangle(texture=texture, pos=(x, y), size=texture.size))
+    
+    def _redraw(self, *args):
+        """Rebuilds the whole instruction group from the current data and size"""
+        self._group.clear()
+        x, y, width, height = self._plot_area()
+        if width <= 0 or height <= 0:
+            return
+        
+        for color, (vertices, indices) in self.build_meshes().items():
+            self._group.add(Color(*color))
+            self._group.add(Mesh(vertices=vertices, indices=indices, mode='triangles'))
+        
+        # Axis with ticks
+        self._group.add(Color(*Colors.LIGHT_GRAY))
+        points = [x, y + height, x, y, x + width, y]
+        self._group.add(Line(points=points, width=1))
+        if self.values:
+            slot = width / len(self.values)
+            for position in self.tick_positions:
+                tick_x = x + (position + 0.5) * slot
+                self._group.add(Line(points=[tick_x, y, tick_x, y - dp(3)], width=1))
+        
+        # Daily target
+        if self.target > 0:
+            target_y = y + height * self.target / self._scale_top()
+            self._group.add(Color(*Colors.BLUE))
+            self._group.add(Line(points=[x, target_y, x + width, target_y], width=1, dash_length=4, dash_offset=4))
+            self._text(str(int(self.target)), x - dp(3), target_y - dp(6), anchor_right=True)
+        
+        if self.first_label:
+            self._text(self.first_label, x, self.y)
+        if self.last_label:
+            self._text(self.last_label, x + width, self.y, anchor_right=True)
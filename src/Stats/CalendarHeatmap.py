@@ -0,0 +1,116 @@
+"""
+Calendar heatmap widget for the Calorie Counter app
+Shows a year of daily intake against the target as one texture
+"""
+
+from datetime import timedelta
+
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Rectangle
+from kivy.graphics.texture import Texture
+
+from src.UIUtils import UIUtils
+from src.consts import Colors
+
+
+class CalendarHeatmap(Widget):
+    """
+    Week columns of day cells (Monday on top), colored by the progress thresholds
+    of UIUtils.get_color_based_on_progress; days without meals are light gray.
+    
+    The cells are painted into one small RGBA texture, CELL texels each with a
+    transparent gap, which is stretched over the widget with nearest filtering.
+    New data re-blits the texture; resizing only moves the rectangle. A tap on a
+    cell calls on_day_press with the cell's 'YYYY-MM-DD' date.
+    """
+    
+    CELL = 4  # Texels per cell side, one row and one column of them stay transparent as a gap
+    
+    def __init__(self, on_day_press=None, **kwargs):
+        super().__init__(**kwargs)
+        self.on_day_press = on_day_press
+        self.origin = None  # Monday of the first column
+        self.first_date = self.last_date = None
+        self.weeks = 0
+        self._texture = None
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self._rect = Rectangle()
+        self.bind(pos=self._update_rect, size=self._update_rect)
+    
+    def set_data(self, buckets):
+        """Shows daily buckets of get_range_stats (oldest first)"""
+        if not buckets:
+            return
+        self.first_date, self.last_date = buckets[0]['date'], buckets[-1]['date']
+        self.origin = self.first_date - timedelta(days=self.first_date.weekday())
+        self.weeks = (self.last_date - self.origin).days // 7 + 1
+        
+        width, height, pixels = self.build_pixels(buckets)
+        self._texture = Texture.create(size=(width, height), colorfmt='rgba')
+        self._texture.mag_filter = 'nearest'
+        self._texture.blit_buffer(bytes(pixels), colorfmt='rgba', bufferfmt='ubyte')
+        self._rect.texture = self._texture
+        self._update_rect()
+    
+    def build_pixels(self, buckets):
+        """Returns (width, height, RGBA bytes) of the texture, rows bottom to top"""
+        width, height = self.weeks * self.CELL, 7 * self.CELL
+        pixels = bytearray(width * height * 4)
+        for bucket in buckets:
+            if bucket['meals_count'] > 0:
+                color = UIUtils.get_color_based_on_progress(bucket['progress_percentage'])
+            else:
+                color = Colors.LIGHT_GRAY
+            cell = bytes(int(channel * 255) for channel in color) * (self.CELL - 1)
+            
+            column, row = self._cell_of(bucket['date'])
+            left = column * self.CELL
+            for texel_row in range(row * self.CELL + 1, (row + 1) * self.CELL):
+                start = (texel_row * width + left) * 4
+                pixels[start:start + len(cell)] = cell
+        return width, height, pixels
+    
+    def _cell_of(self, day):
+        """Returns (column, row from the bottom) of a day's cell"""
+        offset = (day - self.origin).days
+        return offset // 7, 6 - offset % 7
+    
+    def _cell_size(self):
+        """Returns the side of a cell in pixels, keeping cells square"""
+        if not self.weeks:
+            return 0
+        return min(self.width / self.weeks, self.height / 7)
+    
+    def _grid_pos(self):
+        """Returns the lower left corner of the grid, centered in the widget"""
+        cell = self._cell_size()
+        return self.x + (self.width - cell * self.weeks) / 2, self.y + (self.height - cell * 7) / 2
+    
+    def _update_rect(self, *args):
+        """Stretches the texture over the widget without rebuilding it"""
+        cell = self._cell_size()
+        self._rect.pos = self._grid_pos()
+        self._rect.size = (cell * self.weeks, cell * 7) if self._texture else (0, 0)
+    
+    def date_at(self, x, y):
+        """Returns the date of the cell under window coordinates x, y or None"""
+        cell = self._cell_size()
+        if not cell:
+            return None
+        grid_x, grid_y = self._grid_pos()
+        column, row = int((x - grid_x) // cell), int((y - grid_y) // cell)
+        if not (0 <= column < self.weeks and 0 <= row < 7):
+            return None
+        day = self.origin + timedelta(days=column * 7 + 6 - row)
+        if not (self.first_date <= day <= self.last_date):
+            return None
+        return day
+    
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        day = self.date_at(*touch.pos)
+        if day is not None and self.on_day_press is not None:
+            self.on_day_press(day.strftime('%Y-%m-%d'))
+        return True
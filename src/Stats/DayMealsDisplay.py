@@ -0,0 +1,81 @@
+"""
+Day meals display for the Calorie Counter app
+"""
+
+from datetime import date as date_type
+
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.scrollview import ScrollView
+from kivy.metrics import dp
+
+from src.Styled.BaseDisplayStyle import BaseDisplayStyle
+from src.consts import Colors
+
+
+class DayMealsDisplay(BaseDisplayStyle):
+    """Shows the meals of a single past day, e.g. one tapped in the heatmap"""
+    
+    def __init__(self, data_manager, date):
+        super().__init__(data_manager)
+        self.date = date
+    
+    @property
+    def title_text(self):
+        """Title with the shown date"""
+        return date_type.fromisoformat(self.date).strftime('%a %d.%m.%Y')
+    
+    @property
+    def popup_size_hint(self):
+        """Smaller than the statistics popup it opens from"""
+        return (0.85, 0.7)
+    
+    def create_content(self):
+        """Creates the list of the day's meals with their total"""
+        content = BoxLayout(orientation='vertical', spacing=dp(10))
+        
+        # Only this day is read, through the data manager's day cache
+        meals = self.data_manager.get_meals_for_date(self.date)
+        calories, meals_count = self.data_manager.get_day_total(self.date)
+        
+        percentage = calories / self.data_manager.get_daily_target() * 100
+        content.add_widget(Label(
+            text='{} kcal ({:.0f}% of target)'.format(calories, percentage),
+            font_size=dp(16),
+            bold=True,
+            color=Colors.GRAYER,
+            size_hint_y=None,
+            height=dp(30)
+        ))
+        
+        scroll = ScrollView()
+        meals_layout = BoxLayout(orientation='vertical', size_hint_y=None, spacing=dp(4))
+        meals_layout.bind(minimum_height=meals_layout.setter('height'))
+        for meal in sorted(meals, key=lambda meal: meal['time']):
+            meals_layout.add_widget(self._create_meal_row(meal))
+        
+        if len(meals) < meals_count:
+            # Rolled-up days keep only their totals
+            missing = meals_count - len(meals)
+            meals_layout.add_widget(self._create_note(
+                '{} meals without details (rolled up)'.format(missing) if missing != 1 else '1 meal without details (rolled up)'))
+        elif not meals:
+            meals_layout.add_widget(self._create_note('No meals'))
+        
+        scroll.add_widget(meals_layout)
+        content.add_widget(scroll)
+        return content
+    
+    def _create_meal_row(self, meal):
+        """Creates a row with time, name and calories of a meal"""
+        row = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(30), spacing=dp(10))
+        row.add_widget(Label(text=meal['time'], font_size=dp(14), color=Colors.GRAY, size_hint_x=0.2))
+        name = Label(text=meal['name'], font_size=dp(14), color=Colors.BLACK, halign='left', size_hint_x=0.55)
+        name.bind(size=name.setter('text_size'))
+        row.add_widget(name)
+        row.add_widget(Label(text='{} kcal'.format(meal['calories']), font_size=dp(14), color=Colors.GRAYER, size_hint_x=0.25))
+        return row
+    
+    def _create_note(self, text):
+        """Creates a gray note line"""
+        return Label(text=text, font_size=dp(14), color=Colors.GRAY, size_hint_y=None, height=dp(30))
@@ -0,0 +1,76 @@
+"""
+Hour by weekday heatmap widget for the Calorie Counter app
+"""
+
+from kivy.uix.widget import Widget
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, InstructionGroup, Rectangle
+from kivy.graphics.texture import Texture
+from kivy.metrics import dp
+
+from src.consts import Colors
+
+
+class HourlyHeatmap(Widget):
+    """
+    7x24 grid of calories eaten per weekday (rows, Monday on top) and hour of day
+    (columns), drawn as one 24x7 texture whose cell opacity grows with the
+    calories of the cell relative to the busiest one.
+    """
+    
+    WEEKDAYS = 'MTWTFSS'
+    HOUR_TICKS = (0, 6, 12, 18)
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._texture = None
+        self._group = InstructionGroup()
+        self.canvas.add(self._group)
+        self.bind(pos=self._redraw, size=self._redraw)
+    
+    def set_data(self, calories):
+        """Shows a 7x24 calories matrix of CalorieDataManager.get_time_distribution"""
+        self._texture = Texture.create(size=(24, 7), colorfmt='rgba')
+        self._texture.mag_filter = 'nearest'
+        self._texture.blit_buffer(bytes(self.build_pixels(calories)), colorfmt='rgba', bufferfmt='ubyte')
+        self._redraw()
+    
+    @staticmethod
+    def build_pixels(calories):
+        """Returns the RGBA bytes of the 24x7 texture, rows bottom (Sunday) to top"""
+        peak = max(max(row) for row in calories) or 1
+        red, green, blue = (int(channel * 255) for channel in Colors.GREEN[:3])
+        pixels = bytearray()
+        for weekday in reversed(range(7)):
+            for value in calories[weekday]:
+                # Empty cells stay faintly visible so the grid can be read
+                alpha = 20 + int(235 * value / peak) if value else 20
+                pixels.extend((red, green, blue, alpha))
+        return pixels
+    
+    def _text(self, text, x, y):
+        """Adds a small text texture centered at x, y"""
+        label = CoreLabel(text=text, font_size=dp(9), color=Colors.GRAY)
+        label.refresh()
+        texture = label.texture
+        self._group.add(Color(1, 1, 1, 1))
+        self._group.add(Rectangle(texture=texture, pos=(x - texture.width / 2, y - texture.height / 2), size=texture.size))
+    
+    def _redraw(self, *args):
+        """Rebuilds the grid rectangle and its labels for the current size"""
+        self._group.clear()
+        if self._texture is None:
+            return
+        
+        left, bottom = dp(14), dp(12)
+        cell = min((self.width - left) / 24, (self.height - bottom) / 7)
+        if cell <= 0:
+            return
+        x, y = self.x + left, self.y + bottom
+        self._group.add(Color(1, 1, 1, 1))
+        self._group.add(Rectangle(texture=self._texture, pos=(x, y), size=(cell * 24, cell * 7)))
+        
+        for row, name in enumerate(self.WEEKDAYS):
+            self._text(name, self.x + left / 2, y + (6.5 - row) * cell)
+        for hour in self.HOUR_TICKS:
+            self._text(str(hour), x + (hour + 0.5) * cell, self.y + bottom / 2)
@@ -2,14 +2,24 @@
 Statistics display components for the Calorie Counter app
 """
 
+import itertools
+import threading
+
+from kivy.clock import Clock
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.scrollview import ScrollView
 from kivy.graphics import Color, RoundedRectangle
 from kivy.utils import get_color_from_hex
 from kivy.metrics import dp
+from datetime import date, timedelta
 
+from src.Stats.BarChart import BarChart
+from src.Stats.CalendarHeatmap import CalendarHeatmap
+from src.Stats.DayMealsDisplay import DayMealsDisplay
+from src.Stats.HourlyHeatmap import HourlyHeatmap
 from src.Styled.BaseDisplayStyle import BaseDisplayStyle
+from src.Styled.StyledButton import StyledButton
 from src.UIUtils import UIUtils
 from src.consts import Colors
 
@@ -17,8 +27,54 @@ from src.consts import Colors
 class StatsDisplay(BaseDisplayStyle):
     """Handles statistics display and formatting"""
     
+    # Selector label, number of days (None for the whole history) and bucket size
+    # for each stats view; yearly views are computed by the analytics engine
+    PERIODS = [
+        ('7D', 7, 'day'),
+        ('30D', 30, 'day'),
+        ('90D', 90, 'week'),
+        ('1Y', 365, 'month'),
+        ('5Y', 5 * 365, 'year'),
+        ('All', None, 'year')
+    ]
+    LONG_RANGE_BUCKETS = ('year',)
+    
+    # Bucket cards added per frame while a period is shown; periods with more
+    # buckets than MAX_CARDS are shown by the chart alone
+    CARDS_PER_FRAME = 10
+    MAX_CARDS = 14
+    
+    # Ranges up to this many days are charted per day, longer ones per month
+    CHART_DAILY_DAYS = 366
+    
+    # Views of at least a year (and the whole history) also show the heatmap of these last days
+    HEATMAP_DAYS = 365
+    
     def __init__(self, data_manager):
         super().__init__(data_manager)
+        self.period_index = 0
+        self.period_buttons = []
+        self.period_content = None
+        self._placeholder = None
+        self._period_stats = None
+        self._request = 0  # Bumped for every fill, results of older fills are dropped
+        self.data_manager.bind(**self._data_handlers())
+    
+    def _data_handlers(self):
+        """Returns the change event handlers of the statistics view"""
+        return {event: self._on_data_changed for event in self.data_manager.CHANGE_EVENTS}
+    
+    def set_data_manager(self, data_manager):
+        """Shows statistics of another data manager (e.g. after a profile switch)"""
+        self.data_manager.unbind(**self._data_handlers())
+        self.data_manager = data_manager
+        self.data_manager.bind(**self._data_handlers())
+        self._on_data_changed(data_manager)
+    
+    def _on_data_changed(self, data_manager, *args):
+        """Recomputes the shown period while the statistics are open; a closed view is rebuilt on show"""
+        if self.period_content is not None and self.period_content.get_root_window() is not None:
+            self._fill_period_content()
         
     @property
     def title_text(self):
@@ -27,44 +83,207 @@ class StatsDisplay(BaseDisplayStyle):
     
     def create_content(self):
         """Creates the main content for statistics display"""
-        stats = self.data_manager.get_weekly_stats()
-        
         # Create content container
         content_container = BoxLayout(orientation='vertical', spacing=dp(10))
         
-        # Header with statistics
-        stats_header = self._create_stats_header(stats)
+        content_container.add_widget(self._create_period_selector())
+        
+        # Period dependent part, rebuilt when another period is selected; its
+        # sections together are taller than a phone screen, so they scroll
+        period_scroll = ScrollView()
+        self.period_content = BoxLayout(orientation='vertical', size_hint_y=None, spacing=dp(10))
+        self.period_content.bind(minimum_height=self.period_content.setter('height'))
+        self._fill_period_content()
+        period_scroll.add_widget(self.period_content)
+        content_container.add_widget(period_scroll)
+        
+        return content_container
+    
+    def get_period_stats(self, days, bucket='day'):
+        """Returns range statistics for the last given number of days or the whole history"""
+        today = date.fromisoformat(self.data_manager.get_today_string())
+        start = today - timedelta(days=days - 1) if days else None
+        if bucket in self.LONG_RANGE_BUCKETS:
+            return self.data_manager.get_period_stats(bucket, start, today)
+        return self.data_manager.get_range_stats(start, today, bucket)
+    
+    def get_chart_stats(self, days):
+        """Returns the statistics charted for the last given number of days or the whole history"""
+        today = date.fromisoformat(self.data_manager.get_today_string())
+        start = today - timedelta(days=days - 1) if days else None
+        if days and days <= self.CHART_DAILY_DAYS:
+            return self.data_manager.get_range_stats(start, today, 'day')
+        return self.data_manager.get_period_stats('month', start, today)
+    
+    def get_heatmap_stats(self):
+        """Returns daily statistics of the days shown in the heatmap"""
+        today = date.fromisoformat(self.data_manager.get_today_string())
+        return self.data_manager.get_range_stats(today - timedelta(days=self.HEATMAP_DAYS - 1), today, 'day')
+    
+    def get_time_distribution(self, days):
+        """Returns the weekday by hour distribution of the last given number of days or the whole history"""
+        today = date.fromisoformat(self.data_manager.get_today_string())
+        start = today - timedelta(days=days - 1) if days else None
+        return self.data_manager.get_time_distribution(start, today)
+    
+    def _create_period_selector(self):
+        """Creates the row of period buttons"""
+        selector = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(40), spacing=dp(8))
+        
+        self.period_buttons = []
+        for index, (label, days, bucket) in enumerate(self.PERIODS):
+            button = StyledButton(
+                text=label,
+                bg_color=Colors.BLUE if index == self.period_index else Colors.LIGHT_GRAY,
+                font_size=dp(14),
+                bold=True,
+                color=Colors.BLACK
+            )
+            button.bind(on_press=lambda instance, i=index: self._select_period(i))
+            self.period_buttons.append(button)
+            selector.add_widget(button)
+        
+        return selector
+    
+    def _select_period(self, index):
+        """Switches the displayed period and rebuilds the period content"""
+        self.period_index = index
+        for i, button in enumerate(self.period_buttons):
+            button.bg_color = Colors.BLUE if i == index else Colors.LIGHT_GRAY
+            button.update_graphics()
+        self._fill_period_content()
+    
+    def _fill_period_content(self):
+        """
+        Starts computing the selected period on a worker thread and shows a placeholder;
+        sections are filled in as their results arrive. A newer request cancels this one.
+        """
+        self._request += 1
+        label, days, bucket = self.PERIODS[self.period_index]
         
-        # Additional information
-        avg_daily = stats['avg_daily']
-        extra_info = Label(
-            text='[color=666666]Daily average: {} kcal[/color]'.format(int(avg_daily)),
+        self.period_content.clear_widgets()
+        self._placeholder = Label(
+            text='[color=666666]Loading statistics...[/color]',
             font_size=dp(14),
             size_hint_y=None,
             height=dp(30),
             markup=True
         )
+        self.period_content.add_widget(self._placeholder)
+        
+        # Refresh today's key here, so the worker never has to reschedule the rollover timer
+        self.data_manager.get_today_string()
+        worker = threading.Thread(target=self._compute_period, args=(self._request, days, bucket), daemon=True)
+        worker.start()
+    
+    def _compute_period(self, request, days, bucket):
+        """Computes the period sections on the worker thread, handing each one to the main thread"""
+        sections = [
+            ('summary', lambda: self.get_period_stats(days, bucket)),
+            ('chart', lambda: self.get_chart_stats(days)),
+            ('heatmap', self.get_heatmap_stats if not days or days >= self.HEATMAP_DAYS else None),
+            ('time', lambda: self.get_time_distribution(days)),
+            ('rolling', self.data_manager.get_rolling_stats),
+            ('streaks', self.data_manager.get_streak_stats)
+        ]
+        for name, compute in sections:
+            if request != self._request:
+                return  # A newer request took over
+            if compute is None:
+                continue
+            try:
+                result = compute()
+            except Exception:
+                Clock.schedule_once(lambda dt: self._show_section(request, 'error', bucket, None))
+                raise
+            Clock.schedule_once(lambda dt, name=name, result=result: self._show_section(request, name, bucket, result))
+    
+    def _is_current(self, request):
+        """Returns whether results of request should still be shown"""
+        return request == self._request and self.period_content.get_root_window() is not None
+    
+    def _show_section(self, request, name, bucket, result):
+        """Adds the widgets of one computed section on the main thread"""
+        if not self._is_current(request):
+            return
+        
+        # The placeholder stays at the bottom until the bucket cards start
+        self.period_content.remove_widget(self._placeholder)
+        if name == 'summary':
+            self._period_stats = result
+            self.period_content.add_widget(self._create_stats_header(result))
+            
+            # Additional information
+            avg_text = 'Daily average: {} kcal'.format(int(result['avg_daily']))
+            if 'std_daily' in result:
+                avg_text += ' ± {}'.format(int(result['std_daily']))
+            self.period_content.add_widget(Label(
+                text='[color=666666]{}[/color]'.format(avg_text),
+                font_size=dp(14),
+                size_hint_y=None,
+                height=dp(30),
+                markup=True
+            ))
+        elif name == 'chart':
+            self.period_content.add_widget(self._create_chart(result))
+        elif name == 'heatmap':
+            heatmap = CalendarHeatmap(on_day_press=self._show_day, size_hint_y=None, height=dp(60))
+            heatmap.set_data(result['buckets'])
+            self.period_content.add_widget(heatmap)
+        elif name == 'time':
+            # When in the day the calories of the period were eaten
+            time_heatmap = HourlyHeatmap(size_hint_y=None, height=dp(90))
+            time_heatmap.set_data(result['calories'])
+            self.period_content.add_widget(time_heatmap)
+        elif name == 'rolling':
+            # Moving averages with their trends, independent of the selected period
+            self.period_content.add_widget(self._create_rolling_stats(result))
+        elif name == 'streaks':
+            # Under-target streaks and adherence over the whole history
+            self.period_content.add_widget(Label(
+                text='[color=666666]Streak: {} (best {}), {:.0f}% of logged days within 10% of target[/color]'.format(
+                    self._format_days(result['current_streak']),
+                    self._format_days(result['longest_streak']),
+                    result['within_target_percentage']
+                ),
+                font_size=dp(12),
+                size_hint_y=None,
+                height=dp(25),
+                markup=True
+            ))
+            self._show_bucket_cards(request, bucket, result['logged_per_month'])
+            return
+        else:
+            self._placeholder.text = '[color=666666]Statistics are not available[/color]'
+        self.period_content.add_widget(self._placeholder)
+    
+    def _show_bucket_cards(self, request, bucket, logged_per_month):
+        """Adds the bucket cards a few per frame, so long periods do not freeze the popup"""
+        if len(self._period_stats['buckets']) > self.MAX_CARDS:
+            return  # The chart shows them
+        buckets = iter(self._period_stats['buckets'])
         
-        # Daily details with progress
-        details_scroll = ScrollView()
+        # Cards scroll together with the sections above them
         details_layout = BoxLayout(
             orientation='vertical',
             size_hint_y=None,
             spacing=dp(8)
         )
         details_layout.bind(minimum_height=details_layout.setter('height'))
+        self.period_content.add_widget(details_layout)
         
-        for day_data in stats['daily_data']:
-            day_card = self._create_day_card(day_data)
-            details_layout.add_widget(day_card)
-        
-        details_scroll.add_widget(details_layout)
-        
-        content_container.add_widget(stats_header)
-        content_container.add_widget(extra_info)
-        content_container.add_widget(details_scroll)
+        def add_cards(dt):
+            if not self._is_current(request):
+                return
+            chunk = list(itertools.islice(buckets, self.CARDS_PER_FRAME))
+            for day_data in chunk:
+                # Month cards also tell on how many days anything was logged
+                logged_days = logged_per_month.get(day_data['date_str'][:7], 0) if bucket == 'month' else None
+                details_layout.add_widget(self._create_day_card(day_data, bucket, logged_days))
+            if len(chunk) == self.CARDS_PER_FRAME:
+                Clock.schedule_once(add_cards)
         
-        return content_container
+        add_cards(0)
     
     def show_weekly_stats(self):
         """Displays beautiful weekly statistics using base display style"""
@@ -90,21 +309,21 @@ class StatsDisplay(BaseDisplayStyle):
             Colors.GREEN
         )
         
-        # Weekly target
+        # Target for the whole period
         target_box = self._create_stat_box(
             'Target', 
-            f'{stats["target_weekly"]}', 
+            f'{stats["target_total"]}', 
             'kcal', 
             Colors.BLUE
         )
         
         # Progress percentage
-        percent_color = UIUtils.get_color_based_on_progress(stats['weekly_percentage'])
-        percent_status = 'TARGET' if stats['weekly_percentage'] >= 90 else 'GOOD' if stats['weekly_percentage'] >= 70 else 'LOW'
+        percent_color = UIUtils.get_color_based_on_progress(stats['percentage'])
+        percent_status = 'TARGET' if stats['percentage'] >= 90 else 'GOOD' if stats['percentage'] >= 70 else 'LOW'
         
         percent_box = self._create_stat_box(
             'Progress', 
-            f'{stats["weekly_percentage"]:.0f}%', 
+            f'{stats["percentage"]:.0f}%', 
             percent_status, 
             percent_color
         )
@@ -117,6 +336,58 @@ class StatsDisplay(BaseDisplayStyle):
         
         return stats_header
     
+    @staticmethod
+    def _format_days(count):
+        """Formats a number of days"""
+        return '1 day' if count == 1 else '{} days'.format(count)
+    
+    def _show_day(self, date):
+        """Opens the meals of a day tapped in the heatmap"""
+        DayMealsDisplay(self.data_manager, date).show_display()
+    
+    def _create_chart(self, stats):
+        """Creates the bar chart of daily (or for long ranges monthly) averages"""
+        chart = BarChart(size_hint_y=None, height=dp(140))
+        buckets = stats['buckets']
+        if not buckets:
+            return chart
+        
+        if stats['bucket'] == 'day':
+            # Month starts, and weekdays too while single days are wide enough
+            ticks = [i for i, item in enumerate(buckets) if item['date'].day == 1 or
+                     (len(buckets) <= 31 and item['date'].weekday() == 0)]
+            label_format = '%d.%m'
+        else:
+            ticks = [i for i, item in enumerate(buckets) if item['date'].month == 1]
+            label_format = '%m.%Y'
+        chart.set_data(
+            buckets,
+            buckets[0]['date'].strftime(label_format),
+            buckets[-1]['end_date'].strftime(label_format),
+            ticks
+        )
+        return chart
+    
+    def _create_rolling_stats(self, rolling):
+        """Creates the row of moving averages, each with its weekly trend"""
+        row = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(70))
+        
+        for days, window in sorted(rolling.items()):
+            # Trend as the change of daily intake over one week
+            weekly_change = window['slope'] * 7
+            if abs(weekly_change) < 1:
+                trend_text = 'steady'
+            else:
+                trend_text = '{:+.0f} / week'.format(weekly_change)
+            row.add_widget(self._create_stat_box(
+                '{}D average'.format(days),
+                '{}'.format(int(window['avg_daily'])),
+                trend_text,
+                UIUtils.get_color_based_on_progress(window['avg_daily'] / self.data_manager.get_daily_target() * 100)
+            ))
+        
+        return row
+    
     def _create_stat_box(self, title, value, unit, color):
         """Creates a statistics box widget"""
         box = BoxLayout(orientation='vertical', size_hint_x=0.33)
@@ -140,8 +411,8 @@ class StatsDisplay(BaseDisplayStyle):
         
         return box
     
-    def _create_day_card(self, day_data):
-        """Creates a card for a single day in statistics"""
+    def _create_day_card(self, day_data, bucket='day', logged_days=None):
+        """Creates a card for a single day, week or month in statistics"""
         card = BoxLayout(
             orientation='horizontal',
             size_hint_y=None,
@@ -159,8 +430,18 @@ class StatsDisplay(BaseDisplayStyle):
         self.create_card_background(card, bg_color)
         
         # Date
-        day_name = day_data['date'].strftime('%a')  # Day abbreviation
-        day_date = day_data['date'].strftime('%d.%m')
+        if bucket == 'year':
+            day_name = 'Year'
+            day_date = day_data['date'].strftime('%Y')
+        elif bucket == 'month':
+            day_name = day_data['date'].strftime('%b')  # Month abbreviation
+            day_date = day_data['date'].strftime('%Y')
+        elif bucket == 'week':
+            day_name = 'Week'
+            day_date = day_data['date'].strftime('%d.%m')
+        else:
+            day_name = day_data['date'].strftime('%a')  # Day abbreviation
+            day_date = day_data['date'].strftime('%d.%m')
         
         date_layout = BoxLayout(orientation='vertical', size_hint_x=0.25)
         date_layout.add_widget(Label(
@@ -186,6 +467,10 @@ class StatsDisplay(BaseDisplayStyle):
         ))
         
         meals_text = '{} meals'.format(day_data['meals_count']) if day_data['meals_count'] != 1 else '1 meal'
+        if 'std_daily' in day_data:
+            meals_text += ', ± {} kcal/day'.format(int(day_data['std_daily']))
+        if logged_days is not None:
+            meals_text += ', {} logged'.format(self._format_days(logged_days))
         info_layout.add_widget(Label(
             text=meals_text,
             font_size=dp(12),
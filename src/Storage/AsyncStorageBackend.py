@@ -0,0 +1,150 @@
+"""
+Asynchronous storage backend for the Calorie Counter app
+Moves writes of another backend off the UI thread onto a persistence worker
+"""
+
+import threading
+
+from src.Storage.BaseStorageBackend import BaseStorageBackend
+from src.Storage.PersistenceWorker import PersistenceWorker
+
+
+class AsyncStorageBackend(BaseStorageBackend):
+    """
+    Wraps another backend and applies its writes on a worker thread.
+
+    Writes are queued and applied strictly in submission order; the queue is
+    bounded, so a caller only blocks once max_pending writes are waiting.
+    Reads first wait for this backend's queued writes (see barrier), so they
+    always see every write submitted before them. Single-meal writes return
+    None because the removed or replaced meal is not known until the worker
+    applies them. A write that fails on the worker is raised from the next
+    write or barrier. A worker may be shared by several backends; a backend
+    stops only a worker it created itself.
+    """
+
+    def __init__(self, backend, max_pending=256, worker=None):
+        self.backend = backend
+        self._owns_worker = worker is None
+        self.worker = worker if worker is not None else PersistenceWorker(max_pending)
+        self._lock = threading.Lock()  # Serializes access to the wrapped backend
+        self._done = threading.Condition()
+        self._pending = 0
+        self._error = None
+        self._closed = False
+
+    # === Worker ===
+
+    def _apply(self, method, *args):
+        """Runs a write on the worker thread"""
+        with self._lock:
+            method(*args)
+
+    def _on_done(self, error):
+        """Records a finished write and wakes up waiting readers"""
+        with self._done:
+            if error is not None and self._error is None:
+                self._error = error
+            self._pending -= 1
+            self._done.notify_all()
+
+    def _raise_error(self):
+        """Re-raises the first error a queued write failed with"""
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _submit(self, method, *args):
+        """Queues a write, blocking only while the queue is full"""
+        if self._closed:
+            raise ValueError("Storage backend is closed")
+        self._raise_error()
+        with self._done:
+            self._pending += 1
+        self.worker.submit(self._on_done, self._apply, method, *args)
+
+    def barrier(self):
+        """Blocks until every write submitted so far has been applied"""
+        with self._done:
+            while self._pending:
+                self._done.wait()
+        self._raise_error()
+
+    def _read(self, method, *args):
+        """Runs a read once all pending writes are applied"""
+        self.barrier()
+        with self._lock:
+            return method(*args)
+
+    # === Reads ===
+
+    def get_day(self, date):
+        """Returns list of meals stored for date or None if the day does not exist"""
+        return self._read(self.backend.get_day, date)
+
+    def get_dates(self):
+        """Returns sorted list of all stored dates"""
+        return self._read(self.backend.get_dates)
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} for all stored dates"""
+        return self._read(self.backend.get_day_totals)
+
+    def get_setting(self, key, default=None):
+        """Returns stored setting value or default"""
+        return self._read(self.backend.get_setting, key, default)
+
+    # === Writes ===
+
+    def put_day(self, date, meals):
+        """Queues replacing all meals stored for date"""
+        self._submit(self.backend.put_day, date, list(meals))
+
+    def put_days(self, days):
+        """Queues replacing meals for several dates as one write"""
+        self._submit(self.backend.put_days, {date: list(meals) for date, meals in days.items()})
+
+    def append_meal(self, date, meal):
+        """Queues appending a single meal"""
+        self._submit(self.backend.append_meal, date, meal)
+
+    def append_meals(self, meals_by_date):
+        """Queues appending meals given as {date: [meals]} as one write"""
+        self._submit(self.backend.append_meals, {date: list(meals) for date, meals in meals_by_date.items()})
+
+    def merge_days(self, days):
+        """Queues merging days changed in memory into the stored days as one write"""
+        self._submit(self.backend.merge_days,
+                     {date: (list(base), list(meals)) for date, (base, meals) in days.items()})
+
+    def delete_meal(self, date, meal_id):
+        """Queues removing the meal with meal_id from date"""
+        self._submit(self.backend.delete_meal, date, meal_id)
+
+    def update_meal(self, date, meal_id, meal):
+        """Queues replacing the meal with meal_id on date"""
+        self._submit(self.backend.update_meal, date, meal_id, meal)
+
+    def clear_day(self, date):
+        """Queues removing all meals for date"""
+        self._submit(self.backend.clear_day, date)
+
+    def delete_days(self, dates):
+        """Queues removing the given dates"""
+        self._submit(self.backend.delete_days, list(dates))
+
+    def set_setting(self, key, value):
+        """Queues storing a setting value"""
+        self._submit(self.backend.set_setting, key, value)
+
+    def close(self):
+        """Applies pending writes and closes the wrapped backend (and the worker if it is not shared)"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.barrier()
+        finally:
+            if self._owns_worker:
+                self.worker.stop()
+            self.backend.close()
@@ -0,0 +1,60 @@
+"""
+Atomic JsonStore for the Calorie Counter app
+JsonStore variant that never exposes a half-written file to other processes
+"""
+
+import json
+import os
+
+from kivy.storage.jsonstore import JsonStore
+
+from src.Storage.FileLock import FileLock
+
+
+class AtomicJsonStore(JsonStore):
+    """
+    JsonStore that writes through a temporary file renamed over the original.
+
+    Readers in other processes therefore see either the old or the new file,
+    never a truncated one. The store remembers the signature of the file it
+    last loaded or wrote, so reload_if_changed picks up writes made by other
+    processes without reparsing an unchanged file.
+    """
+
+    def __init__(self, filename, **kwargs):
+        self._signature = None
+        super().__init__(filename, **kwargs)
+
+    def store_load(self):
+        self._data = {}
+        self._signature = None
+        try:
+            fd = open(self.filename)
+        except FileNotFoundError:
+            # Let JsonStore report a missing folder
+            return super().store_load()
+        with fd:
+            # Signature of the opened file, not the path, so a concurrent
+            # replace cannot make stale data look current
+            stat = os.fstat(fd.fileno())
+            self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            data = fd.read()
+        if data:
+            self._data = json.loads(data)
+
+    def store_sync(self):
+        if not self._is_changed:
+            return
+        temp_path = self.filename + '.tmp'
+        with open(temp_path, 'w') as fd:
+            json.dump(self._data, fd, indent=self.indent, sort_keys=self.sort_keys)
+            fd.flush()
+            os.fsync(fd.fileno())
+        os.replace(temp_path, self.filename)
+        self._signature = FileLock.file_signature(self.filename)
+        self._is_changed = False
+
+    def reload_if_changed(self):
+        """Reloads the file if another process replaced it since it was last read or written"""
+        if FileLock.file_signature(self.filename) != self._signature:
+            self.store_load()
@@ -0,0 +1,160 @@
+"""
+Abstract storage backend for the Calorie Counter app
+Defines the interface CalorieDataManager uses to persist days, meals and settings
+"""
+
+import re
+from abc import ABC, abstractmethod
+
+
+class BaseStorageBackend(ABC):
+    """
+    Abstract base class for meal storage engines.
+
+    Days are identified by 'YYYY-MM-DD' strings and hold an ordered list of
+    meal dicts ({'id', 'name', 'calories', 'time'}). Settings are simple key/value
+    pairs. Subclasses must implement day and settings access; single-meal
+    operations have generic implementations that engines with cheaper
+    row-level writes should override. Single meals are addressed by id, not
+    by position, so a change never hits another meal when another process
+    changed the day meanwhile. Engines that persist per-day totals
+    next to the meals should override get_day_totals so they can be read
+    without touching meal lists.
+    """
+
+    DATE_KEY_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+    @staticmethod
+    def is_date_key(key):
+        """Returns True if the key looks like a 'YYYY-MM-DD' day key"""
+        return bool(BaseStorageBackend.DATE_KEY_PATTERN.match(key))
+
+    @staticmethod
+    def find_meal(meals, meal_id):
+        """Returns the position of the meal with meal_id in meals or None"""
+        for index, meal in enumerate(meals):
+            if meal.get('id') == meal_id:
+                return index
+        return None
+
+    @staticmethod
+    def merge_day(stored, base, meals):
+        """
+        Returns the meals of a day changed from base to meals in memory, applied to
+        the stored meals: meals of base missing from meals are removed, changed ones
+        replaced and new ones appended, while meals other writers stored are kept
+        """
+        base_by_id = {meal['id']: meal for meal in base}
+        meals_by_id = {meal['id']: meal for meal in meals}
+        merged = []
+        for meal in stored or []:
+            meal_id = meal.get('id')
+            if meal_id not in base_by_id:
+                merged.append(meal)  # Stored by another writer
+            elif meal_id in meals_by_id:
+                changed = meals_by_id[meal_id] != base_by_id[meal_id]
+                merged.append(meals_by_id[meal_id] if changed else meal)
+        merged.extend(meal for meal in meals if meal['id'] not in base_by_id)
+        return merged
+
+    @abstractmethod
+    def get_day(self, date):
+        """Returns list of meals stored for date or None if the day does not exist"""
+        pass
+
+    @abstractmethod
+    def put_day(self, date, meals):
+        """Replaces all meals stored for date"""
+        pass
+
+    @abstractmethod
+    def delete_days(self, dates):
+        """Removes the given dates together with their meals"""
+        pass
+
+    @abstractmethod
+    def get_dates(self):
+        """Returns sorted list of all stored dates"""
+        pass
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} for all stored dates"""
+        totals = {}
+        for date in self.get_dates():
+            meals = self.get_day(date) or []
+            totals[date] = (sum(meal['calories'] for meal in meals), len(meals))
+        return totals
+
+    @abstractmethod
+    def get_setting(self, key, default=None):
+        """Returns stored setting value or default"""
+        pass
+
+    @abstractmethod
+    def set_setting(self, key, value):
+        """Stores a setting value"""
+        pass
+
+    def put_days(self, days):
+        """Replaces meals for several dates given as {date: meals}"""
+        for date, meals in days.items():
+            self.put_day(date, meals)
+
+    def merge_days(self, days):
+        """
+        Stores days changed in memory, given as {date: (base, meals)} where base is
+        the day as it was read, merged with the latest stored days (see merge_day).
+        Engines shared by several processes must lock the read and the write together.
+        """
+        self.put_days({date: self.merge_day(self.get_day(date), base, meals)
+                       for date, (base, meals) in days.items()})
+
+    def append_meal(self, date, meal):
+        """Appends a single meal to the given date"""
+        meals = list(self.get_day(date) or [])
+        meals.append(meal)
+        self.put_day(date, meals)
+
+    def append_meals(self, meals_by_date):
+        """Appends meals given as {date: [meals]} with a single batched write"""
+        days = {}
+        for date, meals in meals_by_date.items():
+            days[date] = list(self.get_day(date) or []) + list(meals)
+        self.put_days(days)
+
+    def delete_meal(self, date, meal_id):
+        """Removes the meal with meal_id from date, returns the removed meal or None"""
+        meals = self.get_day(date)
+        meal_index = self.find_meal(meals or [], meal_id)
+        if meal_index is None:
+            return None
+
+        meals = list(meals)
+        deleted_meal = meals.pop(meal_index)
+        self.put_day(date, meals)
+        return deleted_meal
+
+    def update_meal(self, date, meal_id, meal):
+        """Replaces the meal with meal_id on date, returns the previous meal or None"""
+        meals = self.get_day(date)
+        meal_index = self.find_meal(meals or [], meal_id)
+        if meal_index is None:
+            return None
+
+        meals = list(meals)
+        previous_meal = meals[meal_index]
+        meals[meal_index] = meal
+        self.put_day(date, meals)
+        return previous_meal
+
+    def clear_day(self, date):
+        """Removes all meals for date, keeping the day itself"""
+        self.put_day(date, [])
+
+    def barrier(self):
+        """Blocks until all accepted writes are stored; synchronous engines store them right away"""
+        pass
+
+    def close(self):
+        """Releases any resources held by the backend"""
+        pass
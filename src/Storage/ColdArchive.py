@@ -0,0 +1,72 @@
+"""
+Compressed cold archive for the Calorie Counter app
+Keeps the meal detail of rolled-up days out of the way of normal reads
+"""
+
+import gzip
+import json
+import os
+
+from src.Storage.FileLock import FileLock
+
+
+class ColdArchive:
+    """
+    Append-only gzip file of {"date": ..., "meals": [...]} lines.
+
+    Every append writes a new gzip member, which gzip readers treat as one
+    continuous stream, so existing data is never rewritten. Clearing a day
+    appends a {"date": ..., "cleared": true} line that voids the day's earlier
+    lines, while meals archived after it still count. Reading scans the
+    whole file and is meant for exports and recovery, not for the UI.
+    Appends hold an inter-process lock so members of different processes
+    never interleave.
+    """
+
+    def __init__(self, path='calorie_data.cold.gz'):
+        self.path = path
+        self.lock = FileLock(path)
+
+    def append_days(self, days):
+        """Appends {date: meals} as one compressed member"""
+        self._append([{'date': date, 'meals': days[date]} for date in sorted(days)])
+
+    def clear_days(self, dates):
+        """Appends markers voiding everything archived so far for the given dates"""
+        self._append([{'date': date, 'cleared': True} for date in sorted(dates)])
+
+    def _append(self, records):
+        """Appends records as one compressed member"""
+        if not records:
+            return
+        with self.lock, open(self.path, 'ab') as cold_file:
+            with gzip.GzipFile(fileobj=cold_file, mode='wb') as gzip_file:
+                for record in records:
+                    line = json.dumps(record, ensure_ascii=False)
+                    gzip_file.write((line + '\n').encode('utf-8'))
+            cold_file.flush()
+            os.fsync(cold_file.fileno())
+
+    def iter_days(self):
+        """
+        Yields (date, meals) in the order the days were archived; a cleared day
+        yields (date, None), dropping what was yielded for it before
+        """
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as gzip_file:
+            for line in gzip_file:
+                record = json.loads(line)
+                yield record['date'], None if record.get('cleared') else record['meals']
+
+    def get_day(self, date):
+        """Returns all meals archived for date since it was last cleared or None, scanning the whole archive"""
+        meals = None
+        for archived_date, archived_meals in self.iter_days():
+            if archived_date == date:
+                meals = None if archived_meals is None else (meals or []) + archived_meals
+        return meals
+
+    def close(self):
+        """Releases the lock file handle"""
+        self.lock.close()
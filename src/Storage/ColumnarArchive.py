@@ -0,0 +1,279 @@
+"""
+Columnar binary archive for closed days in the Calorie Counter app
+Stores historical meals as packed arrays instead of a JSON tree of dicts
+"""
+
+import json
+import mmap
+from bisect import bisect_left
+import os
+import struct
+import sys
+from array import array
+from datetime import date as date_type
+
+from src.Storage.FileLock import FileLock
+
+
+class ColumnarArchive:
+    """
+    Read-mostly archive of past days kept as columnar arrays.
+
+    File layout (little endian):
+        magic, day count, meal count, names length
+        names          - JSON list of distinct meal names
+        day_ordinals   - int32[days], sorted
+        day_offsets    - int32[days + 1], first meal row of every day
+        calories       - int32[meals]
+        minutes        - int16[meals], minutes since midnight
+        name_ids       - int32[meals], index into names
+        meal_ids       - int64[meals], stable meal ids (0 for meals without one)
+
+    Loading reads only the header and names; all columns stay memory-mapped
+    and days are found by binary search over day_ordinals, so only the pages
+    of days that are actually requested are read from disk and meal dicts are
+    built for those days alone.
+
+    The file may be shared by several processes: it is only ever replaced
+    atomically, every read first remaps it if another process replaced it, and
+    writes merge into the latest file under an inter-process lock.
+    """
+
+    MAGIC = b'CCA2'
+    LEGACY_MAGIC = b'CCA1'  # Same layout without the meal_ids column
+    HEADER = struct.Struct('<4sIII')
+
+    def __init__(self, path='calorie_data.archive'):
+        self.path = path
+        self.lock = FileLock(path)
+        self._signature = None
+        self._map = None
+        self._views = []  # Column views into the mapping, released before it is closed
+        self._clear()
+        if os.path.exists(path):
+            self._load()
+
+    def _clear(self):
+        """Resets to an empty archive"""
+        self._set_columns([], array('i'), array('i', [0]), array('i'), array('h'), array('i'), array('q'))
+
+    def _set_columns(self, names, day_ordinals, day_offsets, calories, minutes, name_ids, meal_ids):
+        """Replaces all columns and rebuilds the day lookup"""
+        self.names = names
+        self.day_ordinals = day_ordinals
+        self.day_offsets = day_offsets
+        self.calories = calories
+        self.minutes = minutes
+        self.name_ids = name_ids
+        self.meal_ids = meal_ids
+
+    def _position(self, ordinal):
+        """Returns the index of ordinal in day_ordinals or None if the day is not archived"""
+        position = bisect_left(self.day_ordinals, ordinal)
+        if position < len(self.day_ordinals) and self.day_ordinals[position] == ordinal:
+            return position
+        return None
+
+    # === Reading ===
+
+    def _load(self):
+        """Reads the header and names and maps the columns of the archive file"""
+        self._unmap()
+        with open(self.path, 'rb') as archive_file:
+            stat = os.fstat(archive_file.fileno())
+            self._map = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        data = memoryview(self._map)
+        self._views.append(data)
+
+        magic, day_count, meal_count, names_length = self.HEADER.unpack_from(data)
+        if magic not in (self.MAGIC, self.LEGACY_MAGIC):
+            raise ValueError("Not a calorie archive: {}".format(self.path))
+        position = self.HEADER.size
+        names = json.loads(bytes(data[position:position + names_length]).decode('utf-8'))
+        position += names_length
+
+        layout = [('i', day_count), ('i', day_count + 1), ('i', meal_count), ('h', meal_count), ('i', meal_count)]
+        if magic == self.MAGIC:
+            layout.append(('q', meal_count))
+
+        columns = []
+        for typecode, length in layout:
+            column = array(typecode)
+            size = column.itemsize * length
+            if sys.byteorder == 'little':
+                # Columns are used in place; pages are read as days are requested
+                column = data[position:position + size].cast(typecode)
+                self._views.append(column)
+            else:
+                column.frombytes(data[position:position + size])
+                column.byteswap()
+            columns.append(column)
+            position += size
+        if magic == self.LEGACY_MAGIC:
+            columns.append(array('q', bytes(8 * meal_count)))
+
+        self._set_columns(names, *columns)
+
+    def _unmap(self):
+        """Releases the column views and the mapping, leaving an empty archive"""
+        self._clear()
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _refresh(self):
+        """Remaps the file if another process replaced or removed it"""
+        signature = FileLock.file_signature(self.path)
+        if signature == self._signature:
+            return
+        if signature is None:
+            self._signature = None
+            self._unmap()
+        else:
+            self._load()
+
+    @staticmethod
+    def _date_to_ordinal(date):
+        """Converts 'YYYY-MM-DD' to a day ordinal"""
+        return date_type.fromisoformat(date).toordinal()
+
+    @staticmethod
+    def _ordinal_to_date(ordinal):
+        """Converts a day ordinal to 'YYYY-MM-DD'"""
+        return date_type.fromordinal(ordinal).strftime('%Y-%m-%d')
+
+    def __contains__(self, date):
+        self._refresh()
+        return self._position(self._date_to_ordinal(date)) is not None
+
+    def get_day(self, date):
+        """Returns list of meals archived for date or None if it is not archived"""
+        self._refresh()
+        position = self._position(self._date_to_ordinal(date))
+        if position is None:
+            return None
+
+        meals = []
+        for row in range(self.day_offsets[position], self.day_offsets[position + 1]):
+            minutes = self.minutes[row]
+            meal = {
+                'name': self.names[self.name_ids[row]],
+                'calories': self.calories[row],
+                'time': '{:02d}:{:02d}'.format(minutes // 60, minutes % 60)
+            }
+            if self.meal_ids[row]:
+                meal['id'] = self.meal_ids[row]
+            meals.append(meal)
+        return meals
+
+    def get_dates(self, before=None, start=None):
+        """Returns sorted list of archived dates, only those in start..before (exclusive) if given"""
+        self._refresh()
+        ordinals = self.day_ordinals
+        if before is not None:
+            ordinals = ordinals[:bisect_left(ordinals, self._date_to_ordinal(before))]
+        if start is not None:
+            ordinals = ordinals[bisect_left(ordinals, self._date_to_ordinal(start)):]
+        return [self._ordinal_to_date(ordinal) for ordinal in ordinals]
+
+    def get_day_total(self, date):
+        """Returns (calories, meals_count) archived for date, (0, 0) if it is not archived"""
+        self._refresh()
+        position = self._position(self._date_to_ordinal(date))
+        if position is None:
+            return (0, 0)
+        start, end = self.day_offsets[position], self.day_offsets[position + 1]
+        return (sum(self.calories[start:end]), end - start)
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} computed from the columns"""
+        self._refresh()
+        totals = {}
+        for position, ordinal in enumerate(self.day_ordinals):
+            start, end = self.day_offsets[position], self.day_offsets[position + 1]
+            totals[self._ordinal_to_date(ordinal)] = (sum(self.calories[start:end]), end - start)
+        return totals
+
+    # === Writing ===
+
+    def put_days(self, days):
+        """Adds or replaces the given {date: meals} and rewrites the archive"""
+        with self.lock:
+            self._refresh()
+            merged = {ordinal: None for ordinal in self.day_ordinals}
+            for date, meals in days.items():
+                merged[self._date_to_ordinal(date)] = meals
+            self._rebuild(merged)
+
+    def remove_days(self, dates):
+        """Drops the given dates from the archive"""
+        ordinals = {self._date_to_ordinal(date) for date in dates}
+        with self.lock:
+            self._refresh()
+            if not any(self._position(ordinal) is not None for ordinal in ordinals):
+                return
+            merged = {ordinal: None for ordinal in self.day_ordinals if ordinal not in ordinals}
+            self._rebuild(merged)
+
+    def _rebuild(self, merged):
+        """Builds new columns from {ordinal: meals or None (keep archived rows)} and saves them"""
+        names = list(self.names)
+        name_lookup = {name: i for i, name in enumerate(names)}
+        day_ordinals, day_offsets = array('i'), array('i', [0])
+        calories, minutes, name_ids, meal_ids = array('i'), array('h'), array('i'), array('q')
+
+        for ordinal in sorted(merged):
+            meals = merged[ordinal]
+            if meals is None:
+                # Copy the already encoded rows of an unchanged day
+                position = self._position(ordinal)
+                start, end = self.day_offsets[position], self.day_offsets[position + 1]
+                calories.extend(self.calories[start:end])
+                minutes.extend(self.minutes[start:end])
+                name_ids.extend(self.name_ids[start:end])
+                meal_ids.extend(self.meal_ids[start:end])
+            else:
+                for meal in meals:
+                    if meal['name'] not in name_lookup:
+                        name_lookup[meal['name']] = len(names)
+                        names.append(meal['name'])
+                    hours, mins = meal['time'].split(':')
+                    calories.append(meal['calories'])
+                    minutes.append(int(hours) * 60 + int(mins))
+                    name_ids.append(name_lookup[meal['name']])
+                    meal_ids.append(meal.get('id', 0))
+            day_ordinals.append(ordinal)
+            day_offsets.append(len(calories))
+
+        self._save(names, day_ordinals, day_offsets, calories, minutes, name_ids, meal_ids)
+        self._set_columns(names, day_ordinals, day_offsets, calories, minutes, name_ids, meal_ids)
+        self._signature = FileLock.file_signature(self.path)
+
+    def _save(self, names, *columns):
+        """Writes columns to a temporary file and renames it over the archive"""
+        names_bytes = json.dumps(names, ensure_ascii=False).encode('utf-8')
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as archive_file:
+            archive_file.write(self.HEADER.pack(self.MAGIC, len(columns[0]), len(columns[2]), len(names_bytes)))
+            archive_file.write(names_bytes)
+            for column in columns:
+                if sys.byteorder != 'little':
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                archive_file.write(column.tobytes())
+            archive_file.flush()
+            os.fsync(archive_file.fileno())
+        # A mapped file cannot be replaced on every platform; the caller sets the new columns
+        self._unmap()
+        self._signature = None
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        """Releases the mapping and the lock file handle"""
+        self._unmap()
+        self._signature = None
+        self.lock.close()
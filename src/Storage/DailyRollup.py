@@ -0,0 +1,242 @@
+"""
+Daily rollup store for the Calorie Counter app
+Keeps old days as fixed-size aggregate records instead of meal lists
+"""
+
+import mmap
+import os
+import struct
+from datetime import date as date_type
+
+from src.Storage.FileLock import FileLock
+
+
+class DailyRollup:
+    """
+    Aggregates of rolled-up days, one fixed-size record per day.
+
+    File layout (little endian):
+        magic, record count
+        records sorted by day ordinal, each:
+            ordinal, calories, meals count, first and last meal minute
+            (minutes since midnight, -1 without meals), 24 per-hour meal counts
+
+    The file is memory-mapped and searched with a binary search over the
+    records, so opening it costs the same no matter how many days it holds.
+    Other processes' changes are picked up by remapping the file when it was
+    replaced, and writes merge into the latest file under an inter-process lock.
+    """
+
+    MAGIC = b'CCR1'
+    HEADER = struct.Struct('<4sI')
+    RECORD = struct.Struct('<iiHhh24H')
+
+    def __init__(self, path='calorie_data.rollup'):
+        self.path = path
+        self.lock = FileLock(path)
+        self._data = b''
+        self._count = 0
+        self._signature = None
+        if os.path.exists(path):
+            self._load()
+
+    # === Aggregates ===
+
+    @staticmethod
+    def aggregate(meals):
+        """Returns the aggregate dict of a list of meals"""
+        hourly = [0] * 24
+        minutes = []
+        for meal in meals:
+            hours, mins = meal['time'].split(':')
+            hourly[int(hours)] += 1
+            minutes.append(int(hours) * 60 + int(mins))
+        return {
+            'calories': sum(meal['calories'] for meal in meals),
+            'meals_count': len(meals),
+            'first_minute': min(minutes) if minutes else -1,
+            'last_minute': max(minutes) if minutes else -1,
+            'hourly': hourly
+        }
+
+    @staticmethod
+    def combine(first, second):
+        """Returns the aggregate of two aggregates of the same day"""
+        minutes = [aggregate[key] for aggregate in (first, second)
+                   for key in ('first_minute', 'last_minute') if aggregate[key] >= 0]
+        return {
+            'calories': first['calories'] + second['calories'],
+            'meals_count': first['meals_count'] + second['meals_count'],
+            'first_minute': min(minutes) if minutes else -1,
+            'last_minute': max(minutes) if minutes else -1,
+            'hourly': [a + b for a, b in zip(first['hourly'], second['hourly'])]
+        }
+
+    # === Reading ===
+
+    def _load(self):
+        """Maps the rollup file and reads its header"""
+        self._unmap()
+        with open(self.path, 'rb') as rollup_file:
+            stat = os.fstat(rollup_file.fileno())
+            self._data = mmap.mmap(rollup_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        magic, self._count = self.HEADER.unpack_from(self._data)
+        if magic != self.MAGIC:
+            raise ValueError("Not a calorie rollup: {}".format(self.path))
+
+    def _unmap(self):
+        """Releases the current mapping"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        self._count = 0
+
+    def _refresh(self):
+        """Remaps the file if another process replaced or removed it"""
+        signature = FileLock.file_signature(self.path)
+        if signature == self._signature:
+            return
+        if signature is None:
+            self._unmap()
+            self._signature = None
+        else:
+            self._load()
+
+    def _record(self, position):
+        """Returns the unpacked record at position"""
+        return self.RECORD.unpack_from(self._data, self.HEADER.size + position * self.RECORD.size)
+
+    def _ordinal(self, position):
+        """Returns the day ordinal of the record at position"""
+        return struct.unpack_from('<i', self._data, self.HEADER.size + position * self.RECORD.size)[0]
+
+    def _first_position(self, ordinal):
+        """Returns the position of the first record whose day ordinal is not less than ordinal"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._ordinal(middle) < ordinal:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _position(self, date):
+        """Returns the record position of date or None if the day is not rolled up"""
+        ordinal = date_type.fromisoformat(date).toordinal()
+        position = self._first_position(ordinal)
+        if position < self._count and self._ordinal(position) == ordinal:
+            return position
+        return None
+
+    @staticmethod
+    def _record_to_aggregate(record):
+        """Converts a record tuple to an aggregate dict"""
+        return {
+            'calories': record[1],
+            'meals_count': record[2],
+            'first_minute': record[3],
+            'last_minute': record[4],
+            'hourly': list(record[5:])
+        }
+
+    def __contains__(self, date):
+        self._refresh()
+        return self._position(date) is not None
+
+    def get_day(self, date):
+        """Returns the aggregate of date or None if the day is not rolled up"""
+        self._refresh()
+        position = self._position(date)
+        if position is None:
+            return None
+        return self._record_to_aggregate(self._record(position))
+
+    def get_day_total(self, date):
+        """Returns (calories, meals_count) of date, (0, 0) if the day is not rolled up"""
+        self._refresh()
+        position = self._position(date)
+        if position is None:
+            return (0, 0)
+        record = self._record(position)
+        return (record[1], record[2])
+
+    def get_dates(self, start=None, end=None):
+        """Returns sorted list of rolled-up dates, only those in start..end (inclusive) if given"""
+        self._refresh()
+        position = 0 if start is None else self._first_position(date_type.fromisoformat(start).toordinal())
+        last = None if end is None else date_type.fromisoformat(end).toordinal()
+        dates = []
+        while position < self._count:
+            ordinal = self._ordinal(position)
+            if last is not None and ordinal > last:
+                break
+            dates.append(date_type.fromordinal(ordinal).strftime('%Y-%m-%d'))
+            position += 1
+        return dates
+
+    def get_days(self):
+        """Returns {date: aggregate} of all rolled-up days"""
+        self._refresh()
+        days = {}
+        for position in range(self._count):
+            record = self._record(position)
+            days[date_type.fromordinal(record[0]).strftime('%Y-%m-%d')] = self._record_to_aggregate(record)
+        return days
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} of all rolled-up days"""
+        self._refresh()
+        totals = {}
+        for position in range(self._count):
+            record = self._record(position)
+            totals[date_type.fromordinal(record[0]).strftime('%Y-%m-%d')] = (record[1], record[2])
+        return totals
+
+    # === Writing ===
+
+    def add_days(self, aggregates):
+        """Adds {date: aggregate}, combining with days that are already rolled up"""
+        with self.lock:
+            days = self.get_days()
+            for date, aggregate in aggregates.items():
+                days[date] = self.combine(days[date], aggregate) if date in days else aggregate
+            self._save(days)
+
+    def remove_days(self, dates):
+        """Drops the given dates"""
+        with self.lock:
+            if not any(date in self for date in dates):
+                return
+            days = self.get_days()
+            for date in dates:
+                days.pop(date, None)
+            self._save(days)
+
+    def _save(self, days):
+        """Writes all records to a temporary file and renames it over the rollup"""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as rollup_file:
+            rollup_file.write(self.HEADER.pack(self.MAGIC, len(days)))
+            for date in sorted(days):
+                aggregate = days[date]
+                rollup_file.write(self.RECORD.pack(
+                    date_type.fromisoformat(date).toordinal(),
+                    aggregate['calories'],
+                    aggregate['meals_count'],
+                    aggregate['first_minute'],
+                    aggregate['last_minute'],
+                    *aggregate['hourly']
+                ))
+            rollup_file.flush()
+            os.fsync(rollup_file.fileno())
+        self._unmap()
+        os.replace(temp_path, self.path)
+        self._load()
+
+    def close(self):
+        """Releases the mapping and the lock file handle"""
+        self._unmap()
+        self._signature = None
+        self.lock.close()
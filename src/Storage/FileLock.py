@@ -0,0 +1,73 @@
+"""
+Inter-process file lock for the Calorie Counter app
+Serializes writers of the same data file across processes
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Exclusive advisory lock held on a separate '<path>.lock' file.
+
+    Used as a context manager. It is reentrant within a process, so a locked
+    method may call other locked methods, and threads of the same process
+    take turns through thread_lock before the OS lock is requested. Holding
+    thread_lock alone keeps out other threads of this process only.
+    """
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+        self.thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            if self._depth == 0:
+                if self._file is None:
+                    self._file = open(self.path, 'a+b')
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.thread_lock.release()
+
+    def close(self):
+        """Closes the lock file handle"""
+        with self.thread_lock:
+            if self._file is not None and self._depth == 0:
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def file_signature(path):
+        """Returns (inode, mtime, size) of path or None if it does not exist, used to spot changes by other processes"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,318 @@
+"""
+Append-only journal storage backend for the Calorie Counter app
+Every change is appended to an operation log that is folded into a snapshot in the background
+"""
+
+import json
+import os
+import threading
+
+from src.Storage.BaseStorageBackend import BaseStorageBackend
+from src.Storage.FileLock import FileLock
+
+
+class JournalStorageBackend(BaseStorageBackend):
+    """
+    Keeps all days in memory and persists them as a snapshot plus an operation log.
+
+    Each mutation is one appended JSON line carrying a sequence number, so writes
+    cost the same no matter how many days are stored. Once the log grows past
+    compact_threshold bytes it is folded into the snapshot on a worker thread.
+    Both files are replaced atomically and records already covered by the
+    snapshot are skipped on replay, so a kill at any point leaves a readable state.
+
+    Several processes may share the files. Every access takes an inter-process
+    lock and first replays records other processes appended since the last
+    one; a log replaced by another process's compaction triggers a full
+    reload. Appends are numbered after that catch-up, so sequence numbers of
+    different processes never collide.
+    """
+
+    def __init__(self, filename='calorie_data.journal', compact_threshold=256 * 1024):
+        self.snapshot_path = filename
+        self.log_path = filename + '.log'
+        self.compact_threshold = compact_threshold
+
+        self.days = {}
+        self.totals = {}
+        self.settings = {}
+        self.seq = 0
+
+        self._lock = threading.RLock()
+        self.file_lock = FileLock(filename)
+        self._compaction_thread = None
+        self._log_file = None
+        self._log_inode = None
+        self._log_offset = 0
+
+        with self.file_lock:
+            self._reload()
+
+    # === Loading ===
+
+    def _reload(self):
+        """Loads state from scratch and reopens the log for appending"""
+        self.days = {}
+        self.totals = {}
+        self.settings = {}
+        if self._log_file is not None:
+            self._log_file.close()
+        self._log_file = open(self.log_path, 'ab')
+        self._load()
+
+    def _load(self):
+        """Loads the snapshot and replays log records newer than it"""
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            self.days = snapshot.get('days', {})
+            self.settings = snapshot.get('settings', {})
+            snapshot_seq = snapshot.get('seq', 0)
+            if 'totals' in snapshot:
+                self.totals = {date: tuple(total) for date, total in snapshot['totals'].items()}
+            else:
+                self.totals = {date: (sum(meal['calories'] for meal in meals), len(meals))
+                               for date, meals in self.days.items()}
+        self.seq = snapshot_seq
+        self._log_inode = None
+        self._log_offset = 0
+        self._replay_log()
+
+    def _replay_log(self):
+        """Applies log records past the last read offset that are newer than the state"""
+        with open(self.log_path, 'rb') as log_file:
+            self._log_inode = os.fstat(log_file.fileno()).st_ino
+            for record, end_offset in self._read_log(log_file, self._log_offset):
+                if record['seq'] > self.seq:
+                    self._apply(record)
+                    self.seq = record['seq']
+                self._log_offset = end_offset
+
+    @staticmethod
+    def _read_log(log_file, offset=0):
+        """Yields (record, end offset) for valid log records, stopping at a torn trailing line"""
+        log_file.seek(offset)
+        for line in log_file:
+            if not line.endswith(b'\n'):
+                break  # Partially written last record from an interrupted append
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            offset += len(line)
+            yield record, offset
+
+    def _refresh(self):
+        """Catches up with records other processes wrote; call with both locks held"""
+        stat = os.stat(self.log_path)
+        if stat.st_ino != self._log_inode:
+            # Another process compacted: its snapshot covers everything we had
+            self._reload()
+        elif stat.st_size != self._log_offset:
+            self._replay_log()
+
+    def _apply(self, record):
+        """Applies a single log record to the in-memory state and day totals"""
+        op = record['op']
+        date = record.get('date')
+        if op == 'put_day':
+            self.days[date] = list(record['meals'])
+            self.totals[date] = (sum(meal['calories'] for meal in record['meals']), len(record['meals']))
+        elif op == 'append':
+            self.days.setdefault(date, []).append(record['meal'])
+            calories, meals_count = self.totals.get(date, (0, 0))
+            self.totals[date] = (calories + record['meal']['calories'], meals_count + 1)
+        elif op == 'delete':
+            meals = self.days.get(date, [])
+            meal_index = self._record_meal_index(meals, record)
+            if meal_index is not None:
+                deleted_meal = meals.pop(meal_index)
+                calories, meals_count = self.totals[date]
+                self.totals[date] = (calories - deleted_meal['calories'], meals_count - 1)
+        elif op == 'update':
+            meals = self.days.get(date, [])
+            meal_index = self._record_meal_index(meals, record)
+            if meal_index is not None:
+                previous_meal = meals[meal_index]
+                meals[meal_index] = record['meal']
+                calories, meals_count = self.totals[date]
+                self.totals[date] = (calories - previous_meal['calories'] + record['meal']['calories'], meals_count)
+        elif op == 'clear':
+            self.days[date] = []
+            self.totals[date] = (0, 0)
+        elif op == 'delete_days':
+            for deleted_date in record['dates']:
+                self.days.pop(deleted_date, None)
+                self.totals.pop(deleted_date, None)
+        elif op == 'setting':
+            self.settings[record['key']] = record['value']
+
+    @classmethod
+    def _record_meal_index(cls, meals, record):
+        """Returns the position of the meal a delete or update record targets or None"""
+        if 'id' in record:
+            return cls.find_meal(meals, record['id'])
+        # Records written before meals were addressed by id carry a position
+        return record['index'] if 0 <= record['index'] < len(meals) else None
+
+    # === Writing ===
+
+    def _append_record(self, op, **fields):
+        """Applies a change in memory and appends it to the log"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            if os.fstat(self._log_file.fileno()).st_size != self._log_offset:
+                # Drop a torn record left by an interrupted writer before appending after it
+                self._log_file.truncate(self._log_offset)
+            self.seq += 1
+            record = dict(fields, seq=self.seq, op=op)
+            self._apply(record)
+            self._log_file.write((json.dumps(record) + '\n').encode('utf-8'))
+            self._log_file.flush()
+            self._log_offset = self._log_file.tell()
+
+            if self._log_offset >= self.compact_threshold:
+                self.compact_async()
+
+    def get_day(self, date):
+        """Returns list of meals stored for date or None if the day does not exist"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            meals = self.days.get(date)
+            return list(meals) if meals is not None else None
+
+    def put_day(self, date, meals):
+        """Replaces all meals stored for date"""
+        self._append_record('put_day', date=date, meals=list(meals))
+
+    def append_meal(self, date, meal):
+        """Appends a single meal record"""
+        self._append_record('append', date=date, meal=meal)
+
+    def merge_days(self, days):
+        """Appends put_day records of days merged with the latest state under the lock"""
+        with self.file_lock, self._lock:
+            super().merge_days(days)
+
+    def delete_meal(self, date, meal_id):
+        """Appends a delete record, returns the removed meal or None"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            meals = self.days.get(date) or []
+            meal_index = self.find_meal(meals, meal_id)
+            if meal_index is None:
+                return None
+            deleted_meal = meals[meal_index]
+            self._append_record('delete', date=date, id=meal_id)
+        return deleted_meal
+
+    def update_meal(self, date, meal_id, meal):
+        """Appends an update record, returns the previous meal or None"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            meals = self.days.get(date) or []
+            meal_index = self.find_meal(meals, meal_id)
+            if meal_index is None:
+                return None
+            previous_meal = meals[meal_index]
+            self._append_record('update', date=date, id=meal_id, meal=meal)
+        return previous_meal
+
+    def clear_day(self, date):
+        """Appends a clear record for date"""
+        self._append_record('clear', date=date)
+
+    def delete_days(self, dates):
+        """Appends a record removing the given dates"""
+        self._append_record('delete_days', dates=list(dates))
+
+    def get_dates(self):
+        """Returns sorted list of all stored dates"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            return sorted(self.days)
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} kept up to date on every record"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            return dict(self.totals)
+
+    def get_setting(self, key, default=None):
+        """Returns stored setting value or default"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            return self.settings.get(key, default)
+
+    def set_setting(self, key, value):
+        """Appends a setting record"""
+        self._append_record('setting', key=key, value=value)
+
+    # === Compaction ===
+
+    def compact_async(self):
+        """Starts compaction on a worker thread unless one is already running"""
+        with self._lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+            self._compaction_thread.start()
+
+    def compact(self):
+        """Folds the current state into the snapshot and drops covered log records"""
+        with self.file_lock, self._lock:
+            self._refresh()
+            log_inode = self._log_inode
+            snapshot = {
+                'seq': self.seq,
+                'days': {date: list(meals) for date, meals in self.days.items()},
+                'totals': dict(self.totals),
+                'settings': dict(self.settings)
+            }
+
+        # Serializing and syncing the snapshot happens without blocking writers,
+        # under a temporary name private to this process
+        temp_path = '{}.{}.{}.tmp'.format(self.snapshot_path, os.getpid(), threading.get_ident())
+        self._write_synced(temp_path, json.dumps(snapshot))
+
+        with self.file_lock, self._lock:
+            self._refresh()
+            if self._log_inode != log_inode:
+                # Another process compacted meanwhile; its snapshot may be newer than ours
+                os.remove(temp_path)
+                return
+            os.replace(temp_path, self.snapshot_path)
+            with open(self.log_path, 'rb') as log_file:
+                remaining = [json.dumps(record) + '\n' for record, _ in self._read_log(log_file)
+                             if record['seq'] > snapshot['seq']]
+            self._write_atomically(self.log_path, ''.join(remaining))
+            # The state already holds every record, only the log handle moves on
+            self._log_file.close()
+            self._log_file = open(self.log_path, 'ab')
+            self._log_inode = os.fstat(self._log_file.fileno()).st_ino
+            self._log_offset = self._log_file.tell()
+
+    @staticmethod
+    def _write_synced(path, text):
+        """Writes text to path and flushes it to disk"""
+        with open(path, 'w', encoding='utf-8') as output_file:
+            output_file.write(text)
+            output_file.flush()
+            os.fsync(output_file.fileno())
+
+    @classmethod
+    def _write_atomically(cls, path, text):
+        """Writes text to a temporary file and renames it over path"""
+        temp_path = path + '.tmp'
+        cls._write_synced(temp_path, text)
+        os.replace(temp_path, path)
+
+    def close(self):
+        """Waits for a running compaction and closes the log"""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            self._log_file.close()
+        self.file_lock.close()
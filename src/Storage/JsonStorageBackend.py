@@ -0,0 +1,144 @@
+"""
+JsonStore based storage backend for the Calorie Counter app
+"""
+
+from src.Storage.AtomicJsonStore import AtomicJsonStore
+from src.Storage.BaseStorageBackend import BaseStorageBackend
+from src.Storage.FileLock import FileLock
+
+
+class JsonStorageBackend(BaseStorageBackend):
+    """
+    Stores every day as a JsonStore key holding its list of meals and totals.
+
+    The file may be shared by several processes. Every write runs under an
+    inter-process lock and starts from the latest file contents, so
+    read-modify-write cycles of different processes never overwrite each
+    other. Files are replaced atomically, so reads need no inter-process lock
+    and only reparse the file when another process has changed it; they hold
+    the lock's thread lock, as statistics may read on a worker thread while
+    the main thread writes.
+    """
+
+    SETTINGS_KEY = 'settings'
+
+    def __init__(self, filename='calorie_data.json'):
+        self.lock = FileLock(filename)
+        with self.lock:
+            self.store = AtomicJsonStore(filename)
+
+    def _refresh(self):
+        """Picks up changes written by other processes"""
+        self.store.reload_if_changed()
+
+    def get_day(self, date):
+        """Returns list of meals stored for date or None if the day does not exist"""
+        with self.lock.thread_lock:
+            self._refresh()
+            if self.store.exists(date):
+                return self.store.get(date)['meals']
+            return None
+
+    @staticmethod
+    def _day_record(meals):
+        """Builds the stored day record with precomputed totals"""
+        return {
+            'meals': meals,
+            'calories': sum(meal['calories'] for meal in meals),
+            'meals_count': len(meals)
+        }
+
+    def put_day(self, date, meals):
+        """Replaces all meals stored for date"""
+        with self.lock:
+            self._refresh()
+            self.store.put(date, **self._day_record(meals))
+
+    def put_days(self, days):
+        """Replaces meals for several dates with a single file write"""
+        with self.lock:
+            self._refresh()
+            for date, meals in days.items():
+                self.store.store_put(date, self._day_record(meals))
+            self.store.store_sync()
+
+    def delete_days(self, dates):
+        """Removes the given dates with a single file write"""
+        with self.lock:
+            self._refresh()
+            for date in dates:
+                if self.store.exists(date):
+                    self.store.store_delete(date)
+            self.store.store_sync()
+
+    def append_meal(self, date, meal):
+        """Appends a single meal to the given date"""
+        with self.lock:
+            super().append_meal(date, meal)
+
+    def append_meals(self, meals_by_date):
+        """Appends meals given as {date: [meals]} with a single batched write"""
+        with self.lock:
+            super().append_meals(meals_by_date)
+
+    def merge_days(self, days):
+        """Merges days changed in memory into the latest stored days with a single file write"""
+        with self.lock:
+            super().merge_days(days)
+
+    def delete_meal(self, date, meal_id):
+        """Removes the meal with meal_id from date, returns the removed meal or None"""
+        with self.lock:
+            return super().delete_meal(date, meal_id)
+
+    def update_meal(self, date, meal_id, meal):
+        """Replaces the meal with meal_id on date, returns the previous meal or None"""
+        with self.lock:
+            return super().update_meal(date, meal_id, meal)
+
+    def clear_day(self, date):
+        """Removes all meals for date, keeping the day itself"""
+        with self.lock:
+            super().clear_day(date)
+
+    def get_dates(self):
+        """Returns sorted list of all stored dates"""
+        with self.lock.thread_lock:
+            self._refresh()
+            return sorted(key for key in self.store.keys() if self.is_date_key(key))
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} using stored totals where present"""
+        totals = {}
+        with self.lock.thread_lock:
+            for date in self.get_dates():
+                record = self.store.get(date)
+                if 'calories' in record:
+                    totals[date] = (record['calories'], record['meals_count'])
+                else:
+                    # Day written before totals were stored
+                    meals = record['meals']
+                    totals[date] = (sum(meal['calories'] for meal in meals), len(meals))
+        return totals
+
+    def get_setting(self, key, default=None):
+        """Returns stored setting value or default"""
+        with self.lock.thread_lock:
+            self._refresh()
+            if self.store.exists(self.SETTINGS_KEY):
+                return self.store.get(self.SETTINGS_KEY).get(key, default)
+            return default
+
+    def set_setting(self, key, value):
+        """Stores a setting value, keeping the other settings intact"""
+        with self.lock:
+            self._refresh()
+            settings = {}
+            if self.store.exists(self.SETTINGS_KEY):
+                settings = dict(self.store.get(self.SETTINGS_KEY))
+            settings[key] = value
+            self.store.put(self.SETTINGS_KEY, **settings)
+
+    def close(self):
+        """Releases the lock file handle"""
+        self.lock.close()
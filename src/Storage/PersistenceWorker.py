@@ -0,0 +1,47 @@
+"""
+Persistence worker for the Calorie Counter app
+A single background thread that applies queued storage writes in order
+"""
+
+import queue
+import threading
+
+
+class PersistenceWorker:
+    """
+    Bounded queue of write tasks drained by one daemon thread.
+
+    Any number of AsyncStorageBackend instances (for example one per profile)
+    can share a worker, so opening more profiles does not add threads. Each
+    task is (callback, method, args); the callback receives the error raised
+    by the write, or None, once the task has run.
+    """
+
+    def __init__(self, max_pending=256):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Applies queued tasks until the stop marker arrives"""
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            callback, method, args = task
+            try:
+                method(*args)
+            except Exception as error:
+                callback(error)
+            else:
+                callback(None)
+
+    def submit(self, callback, method, *args):
+        """Queues method(*args), blocking only while the queue is full"""
+        self._queue.put((callback, method, args))
+
+    def stop(self):
+        """Lets already queued tasks finish and stops the thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
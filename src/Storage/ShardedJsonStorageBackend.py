@@ -0,0 +1,144 @@
+"""
+Month-sharded JsonStore storage backend for the Calorie Counter app
+Each calendar month lives in its own file so writes only touch the month they change
+"""
+
+import os
+
+from src.Storage.BaseStorageBackend import BaseStorageBackend
+from src.Storage.JsonStorageBackend import JsonStorageBackend
+
+
+class ShardedJsonStorageBackend(BaseStorageBackend):
+    """
+    Stores days in one JsonStorageBackend shard per 'YYYY-MM' inside a directory.
+
+    Settings get their own small file. Shards are opened on first use and
+    writes are routed by the date key, so adding today's meal rewrites only
+    the current month while older months stay untouched on disk. Single-meal
+    writes are delegated to the shard, which locks its file against other
+    processes for the whole read-modify-write.
+    """
+
+    SETTINGS_FILENAME = 'settings.json'
+    SHARD_EXTENSION = '.json'
+
+    def __init__(self, directory='calorie_data.shards'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.shards = {}
+        self.settings = JsonStorageBackend(os.path.join(directory, self.SETTINGS_FILENAME))
+
+    @staticmethod
+    def month_key(date):
+        """Returns the 'YYYY-MM' shard key for a 'YYYY-MM-DD' date"""
+        return date[:7]
+
+    def get_shard(self, month):
+        """Returns the shard for month, opening it on first use"""
+        if month not in self.shards:
+            path = os.path.join(self.directory, month + self.SHARD_EXTENSION)
+            self.shards[month] = JsonStorageBackend(path)
+        return self.shards[month]
+
+    def get_months(self):
+        """Returns sorted list of months that have a shard on disk or open"""
+        months = set(self.shards)
+        for filename in os.listdir(self.directory):
+            name, extension = os.path.splitext(filename)
+            if extension == self.SHARD_EXTENSION and self.is_date_key(name + '-01'):
+                months.add(name)
+        return sorted(months)
+
+    def get_day(self, date):
+        """Returns list of meals stored for date or None if the day does not exist"""
+        return self.get_shard(self.month_key(date)).get_day(date)
+
+    def put_day(self, date, meals):
+        """Replaces all meals stored for date in its month shard"""
+        self.get_shard(self.month_key(date)).put_day(date, meals)
+
+    def put_days(self, days):
+        """Replaces meals for several dates with one write per affected month"""
+        by_month = {}
+        for date, meals in days.items():
+            by_month.setdefault(self.month_key(date), {})[date] = meals
+        for month, month_days in by_month.items():
+            self.get_shard(month).put_days(month_days)
+
+    def append_meal(self, date, meal):
+        """Appends a single meal to the given date in its month shard"""
+        self.get_shard(self.month_key(date)).append_meal(date, meal)
+
+    def append_meals(self, meals_by_date):
+        """Appends meals given as {date: [meals]} with one write per affected month"""
+        by_month = {}
+        for date, meals in meals_by_date.items():
+            by_month.setdefault(self.month_key(date), {})[date] = meals
+        for month, month_meals in by_month.items():
+            self.get_shard(month).append_meals(month_meals)
+
+    def merge_days(self, days):
+        """Merges days changed in memory into the stored days with one write per affected month"""
+        by_month = {}
+        for date, change in days.items():
+            by_month.setdefault(self.month_key(date), {})[date] = change
+        for month, month_days in by_month.items():
+            self.get_shard(month).merge_days(month_days)
+
+    def delete_meal(self, date, meal_id):
+        """Removes the meal with meal_id from date, returns the removed meal or None"""
+        return self.get_shard(self.month_key(date)).delete_meal(date, meal_id)
+
+    def update_meal(self, date, meal_id, meal):
+        """Replaces the meal with meal_id on date, returns the previous meal or None"""
+        return self.get_shard(self.month_key(date)).update_meal(date, meal_id, meal)
+
+    def clear_day(self, date):
+        """Removes all meals for date, keeping the day itself"""
+        self.get_shard(self.month_key(date)).clear_day(date)
+
+    def delete_days(self, dates):
+        """Removes the given dates, dropping month files that end up empty"""
+        by_month = {}
+        for date in dates:
+            by_month.setdefault(self.month_key(date), []).append(date)
+        for month, month_dates in by_month.items():
+            shard = self.get_shard(month)
+            with shard.lock:
+                shard.delete_days(month_dates)
+                is_empty = not shard.get_dates()
+                if is_empty:
+                    # The lock file stays, other processes may be waiting on it
+                    os.remove(shard.store.filename)
+            if is_empty:
+                shard.close()
+                del self.shards[month]
+
+    def get_dates(self):
+        """Returns sorted list of all stored dates"""
+        dates = []
+        for month in self.get_months():
+            dates.extend(self.get_shard(month).get_dates())
+        return dates
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} collected from every shard"""
+        totals = {}
+        for month in self.get_months():
+            totals.update(self.get_shard(month).get_day_totals())
+        return totals
+
+    def get_setting(self, key, default=None):
+        """Returns stored setting value or default"""
+        return self.settings.get_setting(key, default)
+
+    def set_setting(self, key, value):
+        """Stores a setting value in the settings file"""
+        self.settings.set_setting(key, value)
+
+    def close(self):
+        """Releases the lock files of all open shards"""
+        for shard in self.shards.values():
+            shard.close()
+        self.settings.close()
@@ -0,0 +1,210 @@
+"""
+SQLite storage backend for the Calorie Counter app
+Keeps meals in an indexed table so single-meal changes are single-row transactions
+"""
+
+import json
+import sqlite3
+
+from src.Storage.BaseStorageBackend import BaseStorageBackend
+
+
+class SqliteStorageBackend(BaseStorageBackend):
+    """
+    Stores meals as rows of an SQLite table keyed by date, with per-day totals.
+
+    The database may be shared by several processes: it runs in WAL mode so
+    readers never block the writer, writers wait for each other up to
+    LOCK_TIMEOUT seconds, and changes that read before they write take the
+    write lock first. Single meals are found by their meal_id column.
+    """
+
+    LOCK_TIMEOUT = 30.0
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS days ('
+        ' date TEXT PRIMARY KEY,'
+        ' calories INTEGER NOT NULL DEFAULT 0,'
+        ' meals_count INTEGER NOT NULL DEFAULT 0)',
+        'CREATE TABLE IF NOT EXISTS meals ('
+        ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+        ' date TEXT NOT NULL,'
+        ' name TEXT NOT NULL,'
+        ' calories INTEGER NOT NULL,'
+        ' time TEXT NOT NULL,'
+        ' meal_id INTEGER)',
+        'CREATE INDEX IF NOT EXISTS idx_meals_date ON meals (date, id)',
+        'CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+    )
+
+    def __init__(self, filename='calorie_data.db'):
+        # The connection may be driven by a persistence worker thread (AsyncStorageBackend
+        # serializes all calls), so it is not tied to the creating thread
+        self.connection = sqlite3.connect(filename, timeout=self.LOCK_TIMEOUT, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        with self.connection:
+            for statement in self.SCHEMA:
+                self.connection.execute(statement)
+            # Databases created before meals had ids lack the meal_id column
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(meals)')]
+            if 'meal_id' not in columns:
+                self.connection.execute('ALTER TABLE meals ADD COLUMN meal_id INTEGER')
+
+    @staticmethod
+    def _row_to_meal(row):
+        """Converts a (name, calories, time, meal_id) row to a meal dict"""
+        meal = {'name': row[0], 'calories': row[1], 'time': row[2]}
+        if row[3] is not None:
+            meal['id'] = row[3]
+        return meal
+
+    @staticmethod
+    def _meal_to_row(date, meal):
+        """Converts a meal dict to a (date, name, calories, time, meal_id) row"""
+        return (date, meal['name'], meal['calories'], meal['time'], meal.get('id'))
+
+    def get_day(self, date):
+        """Returns list of meals stored for date or None if the day does not exist"""
+        day = self.connection.execute('SELECT 1 FROM days WHERE date = ?', (date,)).fetchone()
+        if day is None:
+            return None
+
+        rows = self.connection.execute(
+            'SELECT name, calories, time, meal_id FROM meals WHERE date = ? ORDER BY id', (date,)
+        )
+        return [self._row_to_meal(row) for row in rows]
+
+    def put_day(self, date, meals):
+        """Replaces all meals stored for date in one transaction"""
+        self.put_days({date: meals})
+
+    def put_days(self, days):
+        """Replaces meals for several dates in one transaction"""
+        with self.connection:
+            self._replace_days(days)
+
+    def _replace_days(self, days):
+        """Rewrites the rows of several dates inside the current transaction"""
+        for date, meals in days.items():
+            self.connection.execute(
+                'INSERT OR REPLACE INTO days (date, calories, meals_count) VALUES (?, ?, ?)',
+                (date, sum(meal['calories'] for meal in meals), len(meals))
+            )
+            self.connection.execute('DELETE FROM meals WHERE date = ?', (date,))
+            self.connection.executemany(
+                'INSERT INTO meals (date, name, calories, time, meal_id) VALUES (?, ?, ?, ?, ?)',
+                [self._meal_to_row(date, meal) for meal in meals]
+            )
+
+    def merge_days(self, days):
+        """Merges days changed in memory into the latest stored days in one transaction"""
+        with self.connection:
+            # Lock before reading so no other process changes the days until they are rewritten
+            self.connection.execute('BEGIN IMMEDIATE')
+            self._replace_days({date: self.merge_day(self.get_day(date), base, meals)
+                                for date, (base, meals) in days.items()})
+
+    def append_meal(self, date, meal):
+        """Inserts a single meal row and bumps the day totals"""
+        with self.connection:
+            self.connection.execute('INSERT OR IGNORE INTO days (date) VALUES (?)', (date,))
+            self.connection.execute(
+                'UPDATE days SET calories = calories + ?, meals_count = meals_count + 1 WHERE date = ?',
+                (meal['calories'], date)
+            )
+            self.connection.execute(
+                'INSERT INTO meals (date, name, calories, time, meal_id) VALUES (?, ?, ?, ?, ?)',
+                self._meal_to_row(date, meal)
+            )
+
+    def append_meals(self, meals_by_date):
+        """Inserts meals given as {date: [meals]} in one transaction"""
+        with self.connection:
+            for date, meals in meals_by_date.items():
+                self.connection.execute('INSERT OR IGNORE INTO days (date) VALUES (?)', (date,))
+                self.connection.execute(
+                    'UPDATE days SET calories = calories + ?, meals_count = meals_count + ? WHERE date = ?',
+                    (sum(meal['calories'] for meal in meals), len(meals), date)
+                )
+                self.connection.executemany(
+                    'INSERT INTO meals (date, name, calories, time, meal_id) VALUES (?, ?, ?, ?, ?)',
+                    [self._meal_to_row(date, meal) for meal in meals]
+                )
+
+    def delete_meal(self, date, meal_id):
+        """Deletes the row of the meal with meal_id on date, returns the removed meal or None"""
+        with self.connection:
+            # Lock before the lookup so no other process can change the row in between
+            self.connection.execute('BEGIN IMMEDIATE')
+            row = self.connection.execute(
+                'SELECT id, name, calories, time, meal_id FROM meals WHERE date = ? AND meal_id = ? ORDER BY id LIMIT 1',
+                (date, meal_id)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute('DELETE FROM meals WHERE id = ?', (row[0],))
+            self.connection.execute(
+                'UPDATE days SET calories = calories - ?, meals_count = meals_count - 1 WHERE date = ?',
+                (row[2], date)
+            )
+        return self._row_to_meal(row[1:])
+
+    def update_meal(self, date, meal_id, meal):
+        """Rewrites the row of the meal with meal_id on date, returns the previous meal or None"""
+        with self.connection:
+            # Lock before the lookup so no other process can change the row in between
+            self.connection.execute('BEGIN IMMEDIATE')
+            row = self.connection.execute(
+                'SELECT id, name, calories, time, meal_id FROM meals WHERE date = ? AND meal_id = ? ORDER BY id LIMIT 1',
+                (date, meal_id)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                'UPDATE meals SET name = ?, calories = ?, time = ?, meal_id = ? WHERE id = ?',
+                (meal['name'], meal['calories'], meal['time'], meal.get('id'), row[0])
+            )
+            self.connection.execute(
+                'UPDATE days SET calories = calories + ? WHERE date = ?',
+                (meal['calories'] - row[2], date)
+            )
+        return self._row_to_meal(row[1:])
+
+    def clear_day(self, date):
+        """Removes all meal rows for date, keeping the day itself"""
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO days (date, calories, meals_count) VALUES (?, 0, 0)', (date,)
+            )
+            self.connection.execute('DELETE FROM meals WHERE date = ?', (date,))
+
+    def delete_days(self, dates):
+        """Removes the given dates and their meal rows in one transaction"""
+        with self.connection:
+            self.connection.executemany('DELETE FROM meals WHERE date = ?', [(date,) for date in dates])
+            self.connection.executemany('DELETE FROM days WHERE date = ?', [(date,) for date in dates])
+
+    def get_dates(self):
+        """Returns sorted list of all stored dates"""
+        return [row[0] for row in self.connection.execute('SELECT date FROM days ORDER BY date')]
+
+    def get_day_totals(self):
+        """Returns {date: (calories, meals_count)} read from the days table"""
+        rows = self.connection.execute('SELECT date, calories, meals_count FROM days')
+        return {date: (calories, meals_count) for date, calories, meals_count in rows}
+
+    def get_setting(self, key, default=None):
+        """Returns stored setting value or default"""
+        row = self.connection.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def set_setting(self, key, value):
+        """Stores a JSON encoded setting value"""
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, json.dumps(value))
+            )
+
+    def close(self):
+        """Closes the database connection"""
+        self.connection.close()
@@ -0,0 +1,30 @@
+"""
+Storage backend selection for the Calorie Counter app
+"""
+
+import os
+
+from src.Storage.JournalStorageBackend import JournalStorageBackend
+from src.Storage.JsonStorageBackend import JsonStorageBackend
+from src.Storage.ShardedJsonStorageBackend import ShardedJsonStorageBackend
+from src.Storage.SqliteStorageBackend import SqliteStorageBackend
+
+
+class StorageFactory:
+    """Creates the storage backend matching a data file name"""
+
+    SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+    JOURNAL_EXTENSIONS = ('.journal',)
+    SHARDED_EXTENSIONS = ('.shards',)
+
+    @staticmethod
+    def create_backend(filename):
+        """Returns SQLite, journal or month-sharded backend based on extension, JsonStore backend otherwise"""
+        extension = os.path.splitext(filename)[1].lower()
+        if extension in StorageFactory.SQLITE_EXTENSIONS:
+            return SqliteStorageBackend(filename)
+        if extension in StorageFactory.JOURNAL_EXTENSIONS:
+            return JournalStorageBackend(filename)
+        if extension in StorageFactory.SHARDED_EXTENSIONS:
+            return ShardedJsonStorageBackend(filename)
+        return JsonStorageBackend(filename)
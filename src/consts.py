@@ -60,4 +60,20 @@ class Colors:
             tuple(Colors.LIGHT_ORANGE): Colors.LIGHT_ORANGE_HEX,
             tuple(Colors.LIGHT_RED): Colors.LIGHT_RED_HEX
         }
-        return dict_color.get(tuple(color), "#000000")
\ No newline at end of file
+        return dict_color.get(tuple(color), "#000000")
+
+
+class Storage:
+    """Data persistence constants"""
+    # Quiet period in seconds before cached meal changes are written to disk
+    FLUSH_DELAY = 2.0
+    # Writes waiting for the persistence worker before the UI thread has to wait (0 writes synchronously)
+    WRITE_QUEUE_SIZE = 256
+    # Days older than this many days keep only daily aggregates (0 keeps every meal)
+    ROLLUP_AFTER_DAYS = 0
+
+
+class Day:
+    """Calendar day constants"""
+    # Local hour at which a new day starts; meals eaten earlier count to the previous day (0 = midnight)
+    START_HOUR = 0